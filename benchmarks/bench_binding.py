@@ -0,0 +1,271 @@
+"""
+Benchmarks for the binding engine.
+
+Run this script with Jython from the project root. AWT is put in headless mode
+so the benchmarks can be run on machines without a display::
+
+    jython benchmarks/bench_binding.py -o results.json
+
+To compare the results against an earlier run::
+
+    jython benchmarks/bench_binding.py -b baseline.json
+
+Times are reported in microseconds per operation and memory usage in bytes.
+When comparing, the exit status is 1 if any benchmark got slower than the
+baseline by more than the given tolerance (10% by default).
+
+"""
+from __future__ import print_function, unicode_literals
+
+from argparse import ArgumentParser
+from timeit import default_timer
+import gc
+import json
+import os
+import platform
+import sys
+
+from java.lang import System, Runtime
+
+System.setProperty('java.awt.headless', 'true')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from swingutils.binding import BindingGroup, MANUAL  # noqa
+from swingutils.beans import AutoChangeNotifier, JavaBeanSupport  # noqa
+
+EXPRESSIONS = {
+    'dotted': 'address.city.name',
+    'subscript': 'items[1]',
+    'call': 'lastName.upper()'
+}
+
+
+class Bean(JavaBeanSupport, AutoChangeNotifier):
+    pass
+
+
+class Target(object):
+    value = None
+
+
+def createSource():
+    city = Bean()
+    city.name = 'Helsinki'
+    address = Bean()
+    address.city = city
+    source = Bean()
+    source.address = address
+    source.items = [1, 2, 3]
+    source.lastName = 'Average'
+    return source
+
+
+def measure(func, number, repeat):
+    """
+    Returns the best time per call (in microseconds) out of ``repeat`` runs of
+    ``number`` calls each.
+
+    """
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        for _ in range(number):
+            func()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best / number * 1000000
+
+
+def usedMemory():
+    runtime = Runtime.getRuntime()
+    for _ in range(3):
+        gc.collect()
+        System.gc()
+    return runtime.totalMemory() - runtime.freeMemory()
+
+
+def benchBindUnbind(args):
+    """Time to bind and then unbind a single binding."""
+
+    source = createSource()
+    target = Target()
+    group = BindingGroup()
+
+    def bindUnbind():
+        group.bind(source, EXPRESSIONS['dotted'], target, 'value')
+        group.unbind()
+
+    return {'bindUnbind': measure(bindUnbind, args.number, args.repeat)}
+
+
+def benchForm(args):
+    """
+    Time to bind (and unbind) 60 fields of a form, one by one and in bulk.
+
+    """
+    source = Bean()
+    target = Bean()
+    expressions = []
+    for i in range(60):
+        setattr(source, 'field%d' % i, i)
+        setattr(target, 'field%d' % i, None)
+        expressions.append(('field%d' % i, 'field%d' % i))
+    group = BindingGroup()
+
+    def bindEach():
+        for sourceExpression, targetExpression in expressions:
+            group.bind(source, sourceExpression, target, targetExpression)
+        group.unbind()
+
+    def bindAll():
+        group.bindAll(source, target, expressions)
+        group.unbind()
+
+    number = max(args.number // 60, 1)
+    return {'form.bind': measure(bindEach, number, args.repeat),
+            'form.bindAll': measure(bindAll, number, args.repeat)}
+
+
+def benchSync(args):
+    """Time to synchronize a manual binding, per expression type."""
+
+    results = {}
+    for kind, expression in sorted(EXPRESSIONS.items()):
+        group = BindingGroup()
+        binding = group.bind(createSource(), expression, Target(), 'value',
+                             mode=MANUAL)
+        results['sync.' + kind] = measure(binding.sync, args.number,
+                                          args.repeat)
+    return results
+
+
+def benchChange(args):
+    """
+    Time from a property change in the source to the target being updated,
+    per expression type.
+
+    """
+    results = {}
+    changes = {
+        'dotted': lambda source: source.address.city.firePropertyChange(
+            'name', None, source.address.city.name),
+        'subscript': lambda source: source.firePropertyChange(
+            'items', None, source.items),
+        'call': lambda source: source.firePropertyChange(
+            'lastName', None, source.lastName)
+    }
+    for kind, expression in sorted(EXPRESSIONS.items()):
+        source = createSource()
+        group = BindingGroup()
+        group.bind(source, expression, Target(), 'value')
+        change = changes[kind]
+        results['change.' + kind] = measure(lambda: change(source),
+                                            args.number, args.repeat)
+        group.unbind()
+    return results
+
+
+def benchFanOut(args):
+    """Time to propagate a single property change to N bindings."""
+
+    results = {}
+    for count in (1, 10, 100):
+        source = createSource()
+        group = BindingGroup()
+        for _ in range(count):
+            group.bind(source, 'lastName', Target(), 'value')
+
+        def change():
+            source.firePropertyChange('lastName', None, source.lastName)
+
+        number = max(args.number // count, 1)
+        results['fanOut.%d' % count] = measure(change, number, args.repeat)
+        group.unbind()
+    return results
+
+
+def benchMemory(args):
+    """Approximate heap usage per bound binding, in bytes."""
+
+    count = 1000
+    source = createSource()
+    targets = [Target() for _ in range(count)]
+    group = BindingGroup()
+    before = usedMemory()
+    for target in targets:
+        group.bind(source, EXPRESSIONS['dotted'], target, 'value')
+    after = usedMemory()
+    group.unbind()
+    return {'memoryPerBinding': float(after - before) / count}
+
+
+BENCHMARKS = [benchBindUnbind, benchForm, benchSync, benchChange, benchFanOut,
+              benchMemory]
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints a comparison of the results against the baseline and returns
+    ``True`` if any of the results regressed more than ``tolerance``.
+
+    """
+    regressed = False
+    print('%-24s %12s %12s %8s' % ('benchmark', 'baseline', 'current',
+                                   'change'))
+    for name in sorted(results):
+        if name not in baseline:
+            print('%-24s %12.2f  (new)' % (name, results[name]))
+            continue
+
+        ratio = results[name] / baseline[name] if baseline[name] else 1.0
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressed = True
+        print('%-24s %12.2f %12.2f %7.1f%%%s' %
+              (name, baseline[name], results[name], (ratio - 1) * 100, flag))
+
+    return regressed
+
+
+def main():
+    parser = ArgumentParser(description='Benchmarks the binding engine')
+    parser.add_argument('-o', '--output', help='write the results to this '
+                        'JSON file')
+    parser.add_argument('-b', '--baseline', help='compare the results to '
+                        'this JSON file')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.1,
+                        help='allowed slowdown relative to the baseline '
+                        '(default: %(default)s)')
+    parser.add_argument('-n', '--number', type=int, default=1000,
+                        help='iterations per run (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='number of runs, of which the best one counts '
+                        '(default: %(default)s)')
+    args = parser.parse_args()
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        results.update(benchmark(args))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_implementation(),
+                       'version': platform.python_version(),
+                       'java': System.getProperty('java.version'),
+                       'results': results}, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+    else:
+        for name in sorted(results):
+            print('%-24s %12.2f' % (name, results[name]))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,21 +7,100 @@ automatically when a matching object is encountered.
 
 """
 from __future__ import unicode_literals, print_function
+from collections import OrderedDict
+from threading import Lock, currentThread
 import __builtin__
+import operator
 import sys
+import weakref
 
-from swingutils.binding.parser import createChains
+from swingutils.binding.dependencies import (buildDependencyGraph,
+                                             findCycles, findReachable)
+from swingutils.binding.parser import (CompiledDependencies, VariableNode,
+                                       expressionCache, getCurrentEvent)
+from swingutils.binding.stats import BindingStats, ExpressionStats, clock
 from swingutils.binding.adapters import swing  # flake8: noqa
+from swingutils.events import addHierarchyListener
+from swingutils.threads.swing import runSwing, runSwingLater
 
 # Synchronization modes
 MANUAL = 0
 ONEWAY = 1
 TWOWAY = 2
 
+# Marker for "nothing written yet" in change suppression
+_NOTHING = object()
 
-class _LocalsProxy(object):
-    def __init__(self, obj, options):
+# Bindings that currently have event listeners added
+_liveBindings = weakref.WeakSet()
+
+# Every binding group that has not been garbage collected
+_groups = weakref.WeakSet()
+
+# Weak mode bindings waiting for either of their root objects to be collected
+_weakBindings = {}  # id(binding) -> (binding, weak references to roots)
+_weakBindingsLock = Lock()
+
+
+class _StrongRef(object):
+    """Mimics a weak reference while holding a strong one."""
+
+    __slots__ = 'obj'
+
+    def __init__(self, obj):
         self.obj = obj
+
+    def __call__(self):
+        return self.obj
+
+
+def _createRef(obj, weak):
+    if weak:
+        try:
+            return weakref.ref(obj)
+        except TypeError:
+            pass  # not weakly referenceable, so hold it strongly instead
+    return _StrongRef(obj)
+
+
+def _reapBinding(key, ref):
+    with _weakBindingsLock:
+        # Ignore references to roots that the binding was rebased away from
+        entry = _weakBindings.get(key)
+        if entry and ref in entry[1]:
+            del _weakBindings[key]
+        else:
+            entry = None
+
+    # Weak reference callbacks may be called from any thread
+    if entry:
+        runSwingLater(entry[0].unbind)
+
+
+def countLiveBindings():
+    """
+    Returns the number of bindings that currently have event listeners
+    added (that is, ones that have been bound but not unbound or reaped).
+    A number that keeps growing over the lifetime of the application is a
+    sign of leaked bindings.
+
+    """
+    return len(_liveBindings)
+
+
+def getLiveGroups():
+    """
+    Returns a list of the binding groups that have at least one binding with
+    event listeners added.
+
+    """
+    return [group for group in list(_groups)
+            if any(b in _liveBindings for b in group.bindings)]
+
+
+class _LocalsProxy(object):
+    def __init__(self, objRef, options):
+        self.objRef = objRef
         self.vars = options['vars'].copy() if 'vars' in options else {}
 
     def __getitem__(self, key):
@@ -29,58 +108,161 @@ class _LocalsProxy(object):
             return self.vars[key]
 
         try:
-            return getattr(self.obj, key)
+            return getattr(self.objRef(), key)
         except AttributeError:
             raise KeyError
 
     def __setitem__(self, key, value):
-        setattr(self.obj, key, value)
+        setattr(self.objRef(), key, value)
 
     def __contains__(self, key):
-        return hasattr(self.obj, key)
+        return hasattr(self.objRef(), key)
 
 
 class BindingExpression(object):
-    reader = None
-    writer = None
     chains = None
+    stats = None
+    bound = False
 
     def __init__(self, root, source, **options):
-        self.root = root
+        self._rootRef = _createRef(root, options.get('weak'))
         self.source = source
         self.options = options
         self.globals = dict(__builtins__=__builtin__)
-        self.locals = _LocalsProxy(root, self.options)
+        self.locals = _LocalsProxy(self._rootRef, self.options)
+
+        # The parsed and compiled forms of the expression are shared between
+        # all expressions with the same source code
+        self.compiled = expressionCache.get(source)
+
+        # Simple paths are read and written directly, bypassing eval()
+        self.accessor = self.compiled.accessor
+
+        if options.get('instrument'):
+            self.stats = ExpressionStats()
+            self.getValue = self.stats.wrapReader(self.getValue)
+            self.setValue = self.stats.wrapWriter(self.setValue)
+
+    @property
+    def root(self):
+        """
+        The root object of the expression. With the ``weak`` option, this is
+        ``None`` once the root object has been garbage collected.
+
+        """
+        return self._rootRef()
 
     def getValue(self):
-        if not self.reader:
-            self.reader = compile(self.source, '$$binding-reader$$', 'eval')
+        if self.accessor:
+            return self.accessor.getValue(self._rootRef(), self.locals.vars)
 
-        return eval(self.reader, self.globals, self.locals)
+        return eval(self.compiled.reader, self.globals, self.locals)
 
     def setValue(self, value):
-        if not self.writer:
-            self.writer = compile('%s=___binding_value' % self.source,
-                                  '$$binding-writer$$', 'exec')
+        if self.accessor:
+            self.accessor.setValue(self._rootRef(), self.locals.vars, value)
+            return
 
         self.locals.vars['___binding_value'] = value
         try:
-            exec(self.writer, self.globals, self.locals)
+            exec(self.compiled.writer, self.globals, self.locals)
         finally:
             del self.locals.vars['___binding_value']
 
     def bind(self, callback):
         if self.chains is None:
-            self.chains = createChains(self.source, callback, self.locals,
-                                       self.options)
+            self.chains = self.compiled.createChains(callback, self.locals,
+                                                     self.options)
+            if self.stats:
+                for node in self.iterNodes():
+                    node.stats = self.stats
 
-        for chain in self.chains:
-            chain.bind(self.root)
+        root = self.root
+        if root is not None:
+            for chain in self.chains:
+                chain.bind(root)
+        self.bound = True
 
     def unbind(self):
         if self.chains:
             for chain in self.chains:
                 chain.unbind()
+        self.bound = False
+
+    def rebase(self, root):
+        """
+        Replaces the root object of this expression. If the expression is
+        bound, the existing binding chains are moved over to the new root
+        object. Only the event listeners on objects that actually change are
+        moved; chains starting from binding variables are left alone.
+
+        """
+        self._rootRef = _createRef(root, self.options.get('weak'))
+        self.locals.objRef = self._rootRef
+        if self.bound:
+            for chain in self.chains:
+                if not isinstance(chain, VariableNode):
+                    chain.rebind(root)
+
+    def iterNodes(self):
+        """Iterates through every node in every binding chain."""
+
+        stack = list(reversed(self.chains or ()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def iterPaths(self):
+        """
+        Iterates through every path from the root node of a chain to a leaf
+        node, as tuples of nodes.
+
+        """
+        stack = [(node,) for node in reversed(self.chains or ())]
+        while stack:
+            path = stack.pop()
+            children = path[-1].children
+            if children:
+                stack.extend(path + (child,) for child in reversed(children))
+            else:
+                yield path
+
+    def isListening(self, obj, attr):
+        """
+        Returns ``True`` if any of the binding chain nodes is listening to
+        the given attribute of the given object.
+
+        """
+        for node in self.iterNodes():
+            if getattr(node, 'attr', None) == attr and node.adapter and \
+                    node.lastParentRef and node.lastParentRef() is obj:
+                return True
+        return False
+
+    def getPaths(self):
+        """
+        Returns the property paths this expression reads, as a list of
+        ``(object, keys)`` tuples where ``keys`` is a tuple of chain template
+        keys leading from ``object`` (either the root object or a binding
+        variable).
+
+        """
+        root = self.root
+        vars = self.locals.vars
+        paths = []
+        for name, keys in self.compiled.paths:
+            if name in vars:
+                paths.append((vars[name], keys))
+            elif root is not None:
+                paths.append((root, (('attr', name),) + keys))
+        return paths
+
+    def countListeners(self):
+        """Returns the number of event listeners currently added."""
+
+        return sum(len(node.adapter.listeners) for node in self.iterNodes()
+                   if node.adapter)
 
     def dump(self, indent=0, outfile=None):
         """
@@ -92,19 +274,441 @@ class BindingExpression(object):
         indentspace = u' ' * indent
         print(u'%sSource code: %s' % (indentspace, self.source), file=outfile)
         if not self.chains:
-            self.chains = createChains(self.source, None, self.locals,
-                                       self.options)
-
-        for i, chain in enumerate(self.chains):
-            node = chain
-            txts = []
-            while node:
-                txts.append(unicode(node))
-                node = node.next
+            self.chains = self.compiled.createChains(None, self.locals,
+                                                     self.options)
+
+        for i, path in enumerate(self.iterPaths()):
+            txts = [unicode(node) for node in path]
             print(u'%sChain %d: %s' % (
                 indentspace, i + 1, u' -> '.join(txts)), file=outfile)
 
 
+class CallableExpression(BindingExpression):
+    """
+    A binding expression that reads (and optionally writes) its value by
+    calling Python functions instead of evaluating source code. Since the
+    functions cannot be analyzed, the property paths to listen to for changes
+    must be given explicitly.
+
+    :param root: the root object, passed to `getter` and `setter`
+    :param getter: a callable that takes the root object and returns the
+        value of the expression
+    :param setter: a callable that takes the root object and a new value
+    :param dependencies: an iterable of simple expressions (like
+        ``address.city``) that the value depends on, relative to the root
+        object or the binding variables, or a single such expression
+
+    """
+    def __init__(self, root, getter, setter=None, dependencies=(),
+                 **options):
+        self._rootRef = _createRef(root, options.get('weak'))
+        self.getter = getter
+        self.setter = setter
+        self.source = getattr(getter, '__name__', repr(getter))
+        self.options = options
+        self.locals = _LocalsProxy(self._rootRef, self.options)
+        self.compiled = CompiledDependencies(dependencies)
+        self.accessor = None
+
+        if options.get('instrument'):
+            self.stats = ExpressionStats()
+            self.getValue = self.stats.wrapReader(self.getValue)
+            self.setValue = self.stats.wrapWriter(self.setValue)
+
+    def getValue(self):
+        return self.getter(self._rootRef())
+
+    def setValue(self, value):
+        if self.setter is None:
+            raise AttributeError('Expression %s is read only' % self.source)
+
+        self.setter(self._rootRef(), value)
+
+
+class SyncScheduler(object):
+    """
+    Synchronizes bindings in the order dictated by their dependencies on each
+    other: a binding that reads a property written by another binding is
+    synchronized after that binding. All bindings that are changed while
+    propagating a single change (a "wave") are synchronized at most once in
+    that wave, so no binding ever sees a stale intermediate value. Bindings
+    that depend on each other in a cycle are synchronized at most once per
+    propagation, since further waves would never settle.
+
+    Bindings can be scheduled for synchronization in the next event dispatch
+    cycle (:meth:`schedule`) or propagated right away (:meth:`propagate`).
+    Scheduling the same binding several times before it has been
+    synchronized only results in a single synchronization, in the direction
+    that was requested last. While the scheduler is suspended, all
+    synchronizations are held back until it is resumed.
+
+    :ivar bindings: the bindings whose dependencies are considered when
+        ordering synchronizations
+    :ivar maxWaves: the maximum number of consecutive waves caused by a single
+        propagation before the remaining synchronizations are dropped (a
+        safeguard against cycles that the dependency analysis cannot see)
+    :ivar suspended: ``True`` if synchronizations are currently held back
+
+    """
+    maxWaves = 100
+    suspended = False
+
+    def __init__(self, bindings=None):
+        self.bindings = bindings if bindings is not None else []
+        self.pending = OrderedDict()  # binding -> reverse
+        self.scheduled = False
+        self._lock = Lock()
+        self._flushingThread = None
+        self._graph = None
+        self._hasDependencies = False
+        self._reachable = {}
+        self._cycles = {}  # node -> list of the nodes in its cycle
+        self._reportedCycles = set()
+        self._readers = {}  # property name -> OrderedDict of nodes
+        self._readNames = {}  # binding -> property names registered for it
+        self._waveEventRef = None
+
+    def schedule(self, binding, reverse=False):
+        with self._lock:
+            self.pending.pop(binding, None)
+            self.pending[binding] = reverse
+            if self.scheduled or self.suspended:
+                return
+            self.scheduled = True
+
+        runSwingLater(self.flush)
+
+    def suspend(self):
+        """Holds back all synchronizations until :meth:`resume` is called."""
+
+        with self._lock:
+            self.suspended = True
+
+    def resume(self):
+        """
+        Stops holding back synchronizations and performs the ones that were
+        held back.
+
+        """
+        with self._lock:
+            self.suspended = False
+        self.flush()
+
+    def propagate(self, binding, reverse=False):
+        """
+        Synchronizes the given binding right away, along with any other
+        bindings that are changed as a result, in dependency order. If a
+        propagation is already in progress in this thread, the binding is
+        just added to it.
+
+        """
+        # Without any dependencies between the bindings, there is nothing to
+        # order
+        if self._flushingThread is None and not self.pending and \
+                not self.hasDependencies():
+            binding.sync(reverse)
+            return
+
+        # The binding may have been synchronized for this event already,
+        # along with the other bindings listening to the same property
+        event = getCurrentEvent()
+        if event is not None and binding._isSyncedFor(event, reverse):
+            return
+
+        with self._lock:
+            if self._flushingThread is not currentThread():
+                self._startWave(event)
+
+            self.pending.pop(binding, None)
+            self.pending[binding] = reverse
+
+        self.flush()
+
+    def discard(self, binding):
+        with self._lock:
+            self.pending.pop(binding, None)
+
+    def register(self, binding):
+        """
+        Records the names of the properties the given binding reads in each
+        direction it listens in, so that the bindings reacting to a change
+        event can all be synchronized in the same wave. Called when the
+        binding is bound.
+
+        """
+        nodes = []
+        if binding.mode >= ONEWAY:
+            nodes.append(((binding, False), binding.sourceExpression))
+        if binding.mode == TWOWAY:
+            nodes.append(((binding, True), binding.targetExpression))
+
+        with self._lock:
+            readNames = self._readNames.setdefault(binding, set())
+            for node, expression in nodes:
+                for name, keys in expression.compiled.paths:
+                    names = [name] + [key[1] for key in keys
+                                      if key[0] == 'attr']
+                    for name in names:
+                        readers = self._readers.setdefault(name, OrderedDict())
+                        readers[node] = None
+                        readNames.add(name)
+
+    def unregister(self, binding):
+        """Forgets the properties recorded for the given binding."""
+
+        with self._lock:
+            for name in self._readNames.pop(binding, ()):
+                nodes = self._readers[name]
+                nodes.pop((binding, False), None)
+                nodes.pop((binding, True), None)
+                if not nodes:
+                    del self._readers[name]
+
+    def invalidate(self):
+        """
+        Forgets the dependency graph between the bindings. This must be called
+        whenever bindings are added or removed, or their root objects change.
+
+        """
+        with self._lock:
+            self._graph = None
+            self._reachable.clear()
+
+    def getGraph(self, extraNodes=()):
+        """
+        Returns the dependency graph of the bindings (see
+        :func:`~swingutils.binding.dependencies.buildDependencyGraph`).
+
+        :param extraNodes: ``(binding, reverse)`` tuples to include in the
+            graph in addition to the directions the bindings are normally
+            synchronized in
+
+        """
+        if self._graph is not None and all(node in self._graph
+                                           for node in extraNodes):
+            return self._graph
+
+        nodes = set(extraNodes)
+        for binding in self.bindings:
+            if binding.mode >= ONEWAY:
+                nodes.add((binding, False))
+            if binding.mode == TWOWAY:
+                nodes.add((binding, True))
+        if self._graph:
+            nodes.update(self._graph)
+
+        self._graph = buildDependencyGraph(nodes)
+        self._hasDependencies = any(self._graph.itervalues())
+        self._reachable.clear()
+        self._cycles = {}
+        if self._hasDependencies:
+            positions = dict((binding, i)
+                             for i, binding in enumerate(self.bindings))
+            for cycle in findCycles(self._graph):
+                cycle.sort(key=lambda node: (positions.get(node[0]), node[1]))
+                for node in cycle:
+                    self._cycles[node] = cycle
+        return self._graph
+
+    def hasDependencies(self):
+        """
+        Returns ``True`` if any of the bindings depends on another one.
+
+        """
+        if self._graph is None:
+            with self._lock:
+                self.getGraph()
+        return self._hasDependencies
+
+    def findCycles(self):
+        """
+        Returns the groups of bindings that depend on each other in a cycle.
+
+        :return: a list of lists of bindings
+
+        """
+        with self._lock:
+            graph = self.getGraph()
+
+        cycles = []
+        for nodes in findCycles(graph):
+            bindings = []
+            for binding, _ in nodes:
+                if binding not in bindings:
+                    bindings.append(binding)
+            cycles.append(bindings)
+        return cycles
+
+    def syncAll(self, bindings, reverse=False):
+        """Synchronizes all the given bindings in dependency order."""
+
+        with self._lock:
+            self.getGraph([(binding, reverse) for binding in bindings])
+        if self._flushingThread is None and not self.pending and \
+                not self._hasDependencies and not self.suspended:
+            for binding in bindings:
+                binding.sync(reverse)
+            return
+
+        with self._lock:
+            if self._flushingThread is not currentThread():
+                self._startWave(None)
+            for binding in bindings:
+                self.pending.pop(binding, None)
+                self.pending[binding] = reverse
+
+        self.flush()
+
+    def flush(self):
+        """Synchronizes all pending bindings right away."""
+
+        thread = currentThread()
+        with self._lock:
+            self.scheduled = False
+            if self.suspended or self._flushingThread is thread:
+                return  # the ongoing flush will pick up any new bindings
+            previousThread = self._flushingThread
+            self._flushingThread = thread
+
+        try:
+            self._runWaves()
+        finally:
+            with self._lock:
+                self._flushingThread = previousThread
+                if previousThread is None:
+                    self._waveEventRef = None
+
+    def _startWave(self, event):
+        self._waveEventRef = None
+        self._reportedCycles.clear()
+        if event is None:
+            return
+
+        try:
+            self._waveEventRef = weakref.ref(event)
+        except TypeError:
+            return
+
+        # Other bindings listening to the same property will receive the same
+        # event right after this one, so they are synchronized in this wave
+        # already, in the right order
+        source = getattr(event, 'source', None)
+        propertyName = getattr(event, 'propertyName', None)
+        if source is None or propertyName is None:
+            return
+
+        self.getGraph()
+        if not self._hasDependencies:
+            return
+
+        for binding, reverse in self._readers.get(propertyName, ()):
+            if binding in self.pending or \
+                    binding._isSyncedFor(event, reverse):
+                continue
+            expression = (binding.targetExpression if reverse else
+                          binding.sourceExpression)
+            if expression.isListening(source, propertyName):
+                self.pending[binding] = reverse
+
+    def _nextNode(self, synced):
+        # Without dependencies, the bindings are synchronized in the order
+        # they were added
+        if self._graph is not None and not self._hasDependencies:
+            for node in self.pending.iteritems():
+                if node not in synced:
+                    if node in self._graph:
+                        return node
+                    break
+
+        candidates = [node for node in self.pending.iteritems()
+                      if node not in synced]
+        if len(candidates) < 2:
+            return candidates[0] if candidates else None
+
+        graph = self.getGraph(candidates)
+        if not self._hasDependencies:
+            return candidates[0]
+
+        # Find the first candidate that no other candidate leads to
+        blocked = set()
+        for other in candidates:
+            blocked.update(node for node in self._getReachable(graph, other)
+                           if node != other)
+        for node in candidates:
+            if node not in blocked:
+                return node
+
+        # Every candidate depends on another one, so break the cycle
+        self._reportCycle(self._cycles.get(candidates[0], candidates))
+        return candidates[0]
+
+    def _getReachable(self, graph, node):
+        reachable = self._reachable.get(node)
+        if reachable is None:
+            reachable = self._reachable[node] = findReachable(graph, node)
+        return reachable
+
+    def _describeNodes(self, nodes):
+        descriptions = []
+        for binding, reverse in nodes:
+            expressions = [binding.sourceExpression.source,
+                           binding.targetExpression.source]
+            if reverse:
+                expressions.reverse()
+            descriptions.append('%s -> %s' % tuple(expressions))
+        return ', '.join(descriptions)
+
+    def _warn(self, nodes, message, *args):
+        for binding, _ in nodes:
+            if binding.logger:
+                binding.logger.warning(message, *args)
+                return
+
+    def _reportCycle(self, cycle):
+        if id(cycle) not in self._reportedCycles:
+            self._reportedCycles.add(id(cycle))
+            self._warn(cycle, 'Binding cycle detected: %s',
+                       self._describeNodes(cycle))
+
+    def _runWaves(self):
+        synced = set()  # nodes synchronized in the current wave
+        propagated = set()  # nodes synchronized in any wave
+        waves = 1
+        while True:
+            with self._lock:
+                node = self._nextNode(synced)
+                if node is None:
+                    # Everything still pending was already synchronized in
+                    # this wave. Drop the bindings of cycles, and start a new
+                    # wave for the rest.
+                    for pendingNode in list(self.pending.iteritems()):
+                        cycle = self._cycles.get(pendingNode)
+                        if cycle and pendingNode in propagated:
+                            del self.pending[pendingNode[0]]
+                            self._reportCycle(cycle)
+                    if not self.pending:
+                        break
+
+                    waves += 1
+                    if waves > self.maxWaves:
+                        nodes = list(self.pending.iteritems())
+                        self._warn(nodes, 'Binding propagation did not '
+                                   'settle in %d waves, dropping: %s',
+                                   self.maxWaves, self._describeNodes(nodes))
+                        self.pending.clear()
+                        break
+                    synced.clear()
+                    continue
+
+                del self.pending[node[0]]
+                synced.add(node)
+                propagated.add(node)
+                if self._waveEventRef:
+                    node[0]._syncedEvent = (self._waveEventRef, node[1])
+
+            node[0].sync(node[1])
+
+
 class Binding(object):
     """
     Holds two expressions -- target and source, and manages synchronization
@@ -115,15 +719,42 @@ class Binding(object):
     # Flag that prevents infinite loops
     _syncing = False
 
+    # Asynchronous source evaluation state
+    _generation = 0
+    _future = None
+
+    # Scheduler for coalesced synchronization (shared within a binding group)
+    scheduler = None
+
+    # Weak reference to the event this binding was last synchronized for by
+    # the scheduler, and the direction
+    _syncedEvent = None
+
+    stats = None
+
     def __init__(self, source, sourceExpression, target, targetExpression,
                  **options):
         self.logger = options.get('logger')
         self.mode = options.get('mode')
         self.ignoreErrors = options.get('ignoreErrors')
         self.errorValue = options.get('errorValue')
+        self.coalesce = options.get('coalesce')
+        self.weak = options.get('weak')
+        self.executor = options.get('executor')
+        self.skipUnchanged = options.get('skipUnchanged')
+        self.comparator = options.get('comparator', operator.eq)
+        self.ordered = options.get('ordered', True)
+        self.skippedWrites = 0
+        self._lastWritten = [_NOTHING, _NOTHING]  # indexed by direction
+        if options.get('instrument'):
+            self.stats = BindingStats()
+            self.sync = self._instrumentedSync
 
         if isinstance(sourceExpression, BindingExpression):
             self.sourceExpression = sourceExpression
+        elif callable(sourceExpression):
+            self.sourceExpression = CallableExpression(
+                source, sourceExpression, **options)
         else:
             self.sourceExpression = BindingExpression(source, sourceExpression,
                                                       **options)
@@ -137,13 +768,56 @@ class Binding(object):
         if self.logger:
             self.logger.debug(u'Source (%s) changed',
                               self.sourceExpression.source)
-        self.sync(False)
+        self.requestSync(False)
 
     def targetChanged(self):
         if self.logger:
             self.logger.debug(u'Target (%s) changed',
                               self.targetExpression.source)
-        self.sync(True)
+        self.requestSync(True)
+
+    def requestSync(self, reverse=False):
+        """
+        Synchronizes this binding in response to a change. If the `coalesce`
+        option is enabled, the synchronization is deferred to the next event
+        dispatch cycle so that bursts of changes only cause one
+        synchronization.
+
+        """
+        if self._syncing:
+            return
+        elif self.coalesce or (self.scheduler and self.scheduler.suspended):
+            if self.scheduler is None:
+                self.scheduler = SyncScheduler()
+            self.scheduler.schedule(self, reverse)
+        elif self.ordered and self.scheduler:
+            self.scheduler.propagate(self, reverse)
+        else:
+            self.sync(reverse)
+
+    def _isSyncedFor(self, event, reverse):
+        if self._syncedEvent is None:
+            return False
+
+        eventRef, syncedReverse = self._syncedEvent
+        syncedEvent = eventRef()
+        return syncedReverse == reverse and syncedEvent is not None and \
+            syncedEvent == event
+
+    def getPaths(self, reverse=False):
+        """
+        Returns the property paths read and written when synchronizing this
+        binding in the given direction (see
+        :meth:`~BindingExpression.getPaths`).
+
+        :return: a tuple of (read paths, written paths)
+
+        """
+        if reverse:
+            return (self.targetExpression.getPaths(),
+                    self.sourceExpression.getPaths())
+        return (self.sourceExpression.getPaths(),
+                self.targetExpression.getPaths())
 
     def sync(self, reverse=False):
         """
@@ -152,32 +826,61 @@ class Binding(object):
         not trigger any further automatic synchronizations within the same
         binding.
 
+        If the `executor` option was given, the source expression is evaluated
+        in that executor and the result is written to the target later, in
+        the event dispatch thread. This only applies to synchronization from
+        source to target.
+
         """
         if self._syncing:
             return
 
+        if self.executor and not reverse:
+            self._syncAsync()
+            return
+
+        value = self._readValue(reverse)
+        self._writeValue(reverse, value)
+
+    def _readValue(self, reverse):
         if reverse:
             sourceExpression = self.targetExpression
-            targetExpression = self.sourceExpression
             source = 'target'
-            target = 'source'
         else:
             sourceExpression = self.sourceExpression
-            targetExpression = self.targetExpression
             source = 'source'
-            target = 'target'
 
         try:
-            value = sourceExpression.getValue()
+            return sourceExpression.getValue()
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             if self.logger:
                 self.logger.debug('Error reading from %s', source,
                                   exc_info=True)
+            if self.stats:
+                self.stats.errors += 1
             if not self.ignoreErrors:
                 raise
-            value = self.errorValue
+            return self.errorValue
+
+    def _writeValue(self, reverse, value):
+        if reverse:
+            targetExpression = self.sourceExpression
+            source = 'target'
+            target = 'source'
+        else:
+            targetExpression = self.targetExpression
+            source = 'source'
+            target = 'target'
+
+        direction = 1 if reverse else 0
+        if self.skipUnchanged and self._isUnchanged(direction, value):
+            self.skippedWrites += 1
+            if self.logger:
+                self.logger.debug('Skipped writing unchanged %s value (%s) '
+                                  'to %s', source, repr(value), target)
+            return
 
         if self.logger:
             self.logger.debug('Writing %s value (%s) to %s', source,
@@ -185,17 +888,75 @@ class Binding(object):
         self._syncing = True
         try:
             targetExpression.setValue(value)
+
+            # The other side now holds whatever was just read, so the memo of
+            # the opposite direction is no longer valid
+            self._lastWritten[direction] = value
+            self._lastWritten[1 - direction] = _NOTHING
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             if self.logger:
                 self.logger.debug('Error writing to %s', target,
                                   exc_info=True)
+            if self.stats:
+                self.stats.errors += 1
             if not self.ignoreErrors:
                 raise
         finally:
             self._syncing = False
 
+    def _syncAsync(self):
+        # Any evaluation still in progress is now superseded by this one
+        self._generation += 1
+        if self._future:
+            self._future.cancel()
+
+        generation = self._generation
+        self._future = self.executor.runBackground(self._readValue, False)
+        self._future.add_done_callback(
+            lambda future: runSwing(self._asyncReadFinished, future,
+                                    generation))
+
+    def _asyncReadFinished(self, future, generation):
+        if generation != self._generation:
+            if self.logger:
+                self.logger.debug('Discarding superseded value of source '
+                                  '(%s)', self.sourceExpression.source)
+            return
+
+        self._future = None
+        value = future.result()
+        if not self._syncing:
+            self._writeValue(False, value)
+
+    def _instrumentedSync(self, reverse=False):
+        if self._syncing:
+            return
+
+        if reverse:
+            self.stats.reverseSyncs += 1
+        else:
+            self.stats.syncs += 1
+
+        start = clock()
+        try:
+            Binding.sync(self, reverse)
+        finally:
+            self.stats.syncTime += clock() - start
+
+    def _isUnchanged(self, direction, value):
+        lastValue = self._lastWritten[direction]
+        if lastValue is _NOTHING:
+            return False
+
+        try:
+            return bool(self.comparator(lastValue, value))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            return False
+
     def bind(self):
         """
         Causes event listeners to be added in source and target expression as
@@ -204,10 +965,18 @@ class Binding(object):
 
         """
         self.unbind()
+        self._addListeners()
+
+    def _addListeners(self):
         if self.mode >= ONEWAY:
             self.sourceExpression.bind(self.sourceChanged)
+            _liveBindings.add(self)
         if self.mode == TWOWAY:
             self.targetExpression.bind(self.targetChanged)
+        if self.weak and self.mode >= ONEWAY:
+            self._registerWeak()
+        if self.scheduler:
+            self.scheduler.register(self)
 
     def unbind(self):
         """
@@ -216,6 +985,70 @@ class Binding(object):
         """
         self.sourceExpression.unbind()
         self.targetExpression.unbind()
+        self._lastWritten = [_NOTHING, _NOTHING]
+        if self.scheduler:
+            self.scheduler.discard(self)
+            self.scheduler.unregister(self)
+        if self._future:
+            self._generation += 1
+            self._future.cancel()
+            self._future = None
+        _liveBindings.discard(self)
+        if self.weak:
+            with _weakBindingsLock:
+                _weakBindings.pop(id(self), None)
+
+    def rebase(self, newRoot, oldRoot=None):
+        """
+        Replaces the root object of the expressions whose root is `oldRoot`
+        with `newRoot`, keeping the existing binding chains. If `oldRoot` is
+        ``None``, it defaults to the root of the source expression, so the
+        target expression is rebased too if it has the same root.
+
+        The binding is not synchronized afterwards.
+
+        :return: ``True`` if either expression was rebased
+
+        """
+        expressions = [self.sourceExpression, self.targetExpression]
+        if oldRoot is None:
+            oldRoot = self.sourceExpression.root
+            if oldRoot is None:
+                expressions = [self.sourceExpression]
+
+        rebased = False
+        for expression in expressions:
+            if expression.root is oldRoot:
+                expression.rebase(newRoot)
+                rebased = True
+
+        if rebased:
+            # Values remembered or being computed for the old root are no
+            # longer valid
+            self._lastWritten = [_NOTHING, _NOTHING]
+            if self._future:
+                self._generation += 1
+                self._future.cancel()
+                self._future = None
+            if self.weak and self.mode >= ONEWAY:
+                self._registerWeak()
+        return rebased
+
+    def _registerWeak(self):
+        # Tear down the binding as soon as either root object is collected.
+        # The references are kept in a global registry because weak reference
+        # callbacks are not called if the reference itself has been collected.
+        key = id(self)
+        callback = lambda ref: _reapBinding(key, ref)
+        refs = []
+        for root in (self.sourceExpression.root, self.targetExpression.root):
+            try:
+                refs.append(weakref.ref(root, callback))
+            except TypeError:
+                pass
+
+        with _weakBindingsLock:
+            _weakBindings[key] = (self, refs)
 
     def dump(self, indent=0, outfile=None):
         """
@@ -238,17 +1071,26 @@ class BindingGroup(object):
     and allow synchronizing all bindings in them at once.
 
     """
+    suspended = False
+    _unbound = False
+    _visibilityListener = None
+
     def __init__(self, **options):
         self.options = options
         self.options.setdefault('mode', ONEWAY)
         self.options.setdefault('ignoreErrors', True)
         self.bindings = []
+        self.scheduler = SyncScheduler(self.bindings)
+        _groups.add(self)
 
     def bind(self, source, source_expr, target, target_expr, **options):
         """
         Binds the source object to the target object using binding expressions.
+        A plain callable source expression is called with the source object
+        to read the value, and is listened to through the paths given in the
+        ``dependencies`` option (see :class:`~CallableExpression`).
 
-        :type source_expr: string or :class:`~BindingExpression`
+        :type source_expr: string, callable or :class:`~BindingExpression`
         :type target_expr: string or :class:`~BindingExpression`
         :rtype: :class:`~Binding`
 
@@ -256,29 +1098,232 @@ class BindingGroup(object):
         combined_opts = self.options.copy()
         combined_opts.update(options)
         b = Binding(source, source_expr, target, target_expr, **combined_opts)
+        b.scheduler = self.scheduler
         self.bindings.append(b)
+        self.scheduler.invalidate()
         b.bind()
         if b.mode != MANUAL:
             b.sync()
         return b
 
+    def bindAll(self, source, target, expressions, **options):
+        """
+        Binds a number of expressions between the same source and target
+        objects at once. Unlike calling :meth:`bind` for each pair of
+        expressions, all expressions are analyzed up front, event listeners
+        are only added once all bindings have been created and the initial
+        synchronization is done once for all of them, in dependency order.
+
+        :param expressions: a dictionary of source expressions to target
+            expressions, or an iterable of ``(source expression, target
+            expression)`` tuples. The bindings are created in the order of
+            the iterable; with a dictionary, the order is arbitrary.
+        :return: the list of created :class:`~Binding` objects
+
+        """
+        combined_opts = self.options.copy()
+        combined_opts.update(options)
+        if hasattr(expressions, 'items'):
+            expressions = expressions.items()
+
+        # Analyze every expression before creating any bindings, so the
+        # bindings find them ready in the expression cache
+        pairs = list(expressions)
+        for pair in pairs:
+            for expression in pair:
+                if isinstance(expression, basestring):
+                    expressionCache.get(expression).analyze()
+
+        bindings = []
+        for source_expr, target_expr in pairs:
+            b = Binding(source, source_expr, target, target_expr,
+                        **combined_opts)
+            b.scheduler = self.scheduler
+            bindings.append(b)
+
+        self.bindings.extend(bindings)
+        self.scheduler.invalidate()
+        for b in bindings:
+            b._addListeners()
+        self.scheduler.syncAll([b for b in bindings if b.mode != MANUAL])
+        return bindings
+
     def unbind(self):
         """Releases all event listeners from all bindings in this group."""
 
+        self.detachFromComponent(resume=False)
         for b in self.bindings:
             b.unbind()
         del self.bindings[:]
+        self.scheduler.invalidate()
+
+        # Unbinding discarded any held back synchronizations, so this only
+        # clears the suspended state
+        self.scheduler.resume()
+        self.suspended = self._unbound = False
+
+    def suspend(self, unbind=False):
+        """
+        Stops synchronizing the bindings in this group until :meth:`resume`
+        is called. Changes made in the meantime are synchronized when the
+        group is resumed.
+
+        :param unbind: ``True`` to also release all event listeners while
+            suspended, in which case every binding is synchronized when the
+            group is resumed
+
+        """
+        if self.suspended:
+            return
+
+        self.suspended = True
+        self._unbound = unbind
+        self.scheduler.suspend()
+        if unbind:
+            for b in self.bindings:
+                b.unbind()
+
+    def resume(self):
+        """
+        Resumes synchronizing the bindings in this group after
+        :meth:`suspend`, catching up on the changes made while suspended.
+
+        """
+        if not self.suspended:
+            return
+
+        self.suspended = False
+        if self._unbound:
+            self._unbound = False
+            for b in self.bindings:
+                b.bind()
+            self.scheduler.resume()
+            self.scheduler.syncAll([b for b in self.bindings
+                                    if b.mode != MANUAL])
+        else:
+            self.scheduler.resume()
+
+    def attachToComponent(self, component, unbind=False):
+        """
+        Ties the synchronization of this group to the visibility of the given
+        component: the group is suspended whenever the component is not
+        showing on the screen (like when it's on a hidden tab or in a closed
+        dialog), and resumed when it's shown again.
+
+        :param unbind: ``True`` to release all event listeners while the
+            component is hidden (see :meth:`suspend`)
+
+        """
+        self.detachFromComponent()
+        self._visibilityListener = addHierarchyListener(
+            component, self._hierarchyChanged, component, unbind)
+        if not component.showing:
+            self.suspend(unbind)
+
+    def detachFromComponent(self, resume=True):
+        """
+        Undoes :meth:`attachToComponent`.
+
+        :param resume: ``True`` to resume the group if it was suspended
+
+        """
+        if self._visibilityListener:
+            self._visibilityListener.unlisten()
+            del self._visibilityListener
+            if resume:
+                self.resume()
+
+    def _hierarchyChanged(self, event, component, unbind):
+        from java.awt.event import HierarchyEvent
+        if event.changeFlags & HierarchyEvent.SHOWING_CHANGED:
+            if component.showing:
+                self.resume()
+            else:
+                self.suspend(unbind)
+
+    @property
+    def skippedWrites(self):
+        """
+        Total number of writes skipped by the bindings in this group because
+        of the `skipUnchanged` option.
+
+        """
+        return sum(b.skippedWrites for b in self.bindings)
+
+    def report(self):
+        """
+        Returns statistics for every binding in this group that was created
+        with the ``instrument`` option, most expensive (by total time spent
+        synchronizing) first.
+
+        :return: a list of dictionaries
+
+        """
+        entries = []
+        for b in self.bindings:
+            if not b.stats:
+                continue
+
+            entry = dict(
+                binding=b, source=b.sourceExpression.source,
+                target=b.targetExpression.source, syncs=b.stats.syncs,
+                reverseSyncs=b.stats.reverseSyncs, syncTime=b.stats.syncTime,
+                errors=b.stats.errors, skippedWrites=b.skippedWrites,
+                listeners=(b.sourceExpression.countListeners() +
+                           b.targetExpression.countListeners()),
+                evaluationTime=0.0, writeTime=0.0, events=0, rebinds=0)
+            for expr in (b.sourceExpression, b.targetExpression):
+                if expr.stats:
+                    entry['evaluationTime'] += expr.stats.evaluationTime
+                    entry['writeTime'] += expr.stats.writeTime
+                    entry['events'] += expr.stats.events
+                    entry['rebinds'] += expr.stats.rebinds
+            entries.append(entry)
+
+        entries.sort(key=lambda entry: entry['syncTime'], reverse=True)
+        return entries
 
     def sync(self, reverse=False):
         """
         Synchronizes all bindings in this group.
 
+        Bindings that depend on other bindings in the group are synchronized
+        after them.
+
         :param reverse: ``True`` to synchronize targets to sources,
                         ``False`` to synchronize sources to targets
 
         """
-        for b in self.bindings:
-            b.sync(reverse)
+        self.scheduler.syncAll(self.bindings, reverse)
+
+    def rebase(self, newRoot, oldRoot=None):
+        """
+        Moves the bindings in this group over to a new root object, without
+        creating new bindings. This is much faster than unbinding the group
+        and binding everything again, which makes it useful for switching
+        the object shown in the detail part of a master-detail view.
+
+        Every binding expression whose root object is `oldRoot` is rebased to
+        `newRoot`. If `oldRoot` is ``None``, the source expression of each
+        binding is rebased, along with its target expression if both have the
+        same root. The rebased bindings are then synchronized (except for
+        those in the ``MANUAL`` mode).
+
+        """
+        rebased = [b for b in self.bindings if b.rebase(newRoot, oldRoot)]
+        self.scheduler.invalidate()
+        self.scheduler.syncAll([b for b in rebased if b.mode != MANUAL])
+
+    def findCycles(self):
+        """
+        Finds bindings in this group that depend on each other in a cycle
+        (like ``a`` -> ``b`` and ``b`` -> ``a``). Synchronizing such bindings
+        may never settle, or depend on the order in which they were created.
+
+        :return: a list of lists of :class:`~Binding` objects
+
+        """
+        return self.scheduler.findCycles()
 
     def dump(self, indent=0, outfile=None):
         """
@@ -7,6 +7,12 @@ instances when given a target object.
 """
 
 from __future__ import print_function
+import weakref
+
+# Kinds of changes reported by BindingAdapter.getChangedRange()
+CHANGED = 0
+INSERTED = 1
+REMOVED = 2
 
 
 class AdapterRegistry(object):
@@ -16,6 +22,10 @@ class AdapterRegistry(object):
     def __init__(self):
         self.propertyAdapters = {}
         self.listAdapters = {}
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self._propertyAdapterCache = {}  # (class, property) -> adapter class
+        self._listAdapterCache = {}  # class -> adapter class
 
     def _getClassNames(self, cls, names=None, level=0):
         """Retrieves the class name of `cls` and names of its superclasses."""
@@ -31,12 +41,33 @@ class AdapterRegistry(object):
             self._getClassNames(basecls, names, level + 1)
         return names
 
+    def clearCache(self):
+        """
+        Forgets the adapter classes resolved for target classes so far.
+        This is done automatically whenever an adapter is registered.
+
+        """
+        self._propertyAdapterCache.clear()
+        self._listAdapterCache.clear()
+
+    def getCacheStats(self):
+        """
+        Returns statistics of the adapter lookup cache as a dictionary
+        with the keys ``hits``, ``misses`` and ``size``.
+
+        """
+        return {'hits': self.cacheHits, 'misses': self.cacheMisses,
+                'size': len(self._propertyAdapterCache) +
+                len(self._listAdapterCache)}
+
     def registerDefaultPropertyAdapter(self, cls):
         self.defaultPropertyAdapter = cls
+        self.clearCache()
         return cls
 
     def registerDefaultListAdapter(self, cls):
         self.defaultListAdapter = cls
+        self.clearCache()
         return cls
 
     def registerPropertyAdapter(self, cls):
@@ -53,40 +84,73 @@ class AdapterRegistry(object):
                 key = (className, property)
                 self.propertyAdapters[key] = cls
 
+        self.clearCache()
         return cls
 
     def registerListAdapter(self, cls):
         key = cls.__targetclass__
         self.listAdapters[key] = cls
+        self.clearCache()
         return cls
 
-    def getPropertyAdapter(self, obj, options, property):
+    def findPropertyAdapterClass(self, cls, property):
+        """
+        Finds the property adapter class for the given target class and
+        property, without consulting the lookup cache.
+
+        """
         # Gather a list of class names from the inheritance chain
-        targetClassNames = self._getClassNames(obj.__class__)
+        targetClassNames = self._getClassNames(cls)
         targetClassNames.sort()
 
         # Find the nearest matching adapter for this class
-        adapterClass = self.defaultPropertyAdapter
         for className in targetClassNames:
             key = (className, property)
             if key in self.propertyAdapters:
-                adapterClass = self.propertyAdapters[key]
-                break
+                return self.propertyAdapters[key]
 
-        if adapterClass:
-            return adapterClass(options, property)
+        return self.defaultPropertyAdapter
 
-    def getListAdapter(self, obj, options):
+    def findListAdapterClass(self, cls):
+        """
+        Finds the list adapter class for the given target class, without
+        consulting the lookup cache.
+
+        """
         # Gather a list of class names from the inheritance chain
-        targetClassNames = self._getClassNames(obj.__class__)
+        targetClassNames = self._getClassNames(cls)
         targetClassNames.sort()
 
         # Find the nearest matching adapter for this class
-        adapterClass = self.defaultListAdapter
         for className in targetClassNames:
             if className in self.listAdapters:
-                adapterClass = self.listAdapters[className]
-                break
+                return self.listAdapters[className]
+
+        return self.defaultListAdapter
+
+    def getPropertyAdapter(self, obj, options, property):
+        key = (obj.__class__, property)
+        try:
+            adapterClass = self._propertyAdapterCache[key]
+            self.cacheHits += 1
+        except KeyError:
+            self.cacheMisses += 1
+            adapterClass = self.findPropertyAdapterClass(obj.__class__,
+                                                         property)
+            self._propertyAdapterCache[key] = adapterClass
+
+        if adapterClass:
+            return adapterClass(options, property)
+
+    def getListAdapter(self, obj, options):
+        key = obj.__class__
+        try:
+            adapterClass = self._listAdapterCache[key]
+            self.cacheHits += 1
+        except KeyError:
+            self.cacheMisses += 1
+            adapterClass = self.findListAdapterClass(obj.__class__)
+            self._listAdapterCache[key] = adapterClass
 
         if adapterClass:
             return adapterClass(options)
@@ -115,16 +179,32 @@ class BindingAdapter(object):
     __slots__ = ('listeners')
 
     def __init__(self, options):
-        self.listeners = {}
+        # In weak mode, the listeners are kept alive by the objects they
+        # listen to, so the adapter must not keep those objects alive through
+        # the listeners
+        if options.get('weak'):
+            self.listeners = weakref.WeakValueDictionary()
+        else:
+            self.listeners = {}
 
     def addListeners(self, parent, callback, *args, **kwargs):
         pass
 
+    def getChangedRange(self, event):
+        """
+        Returns the range of indices affected by the given event as a tuple of
+        ``(kind, first, last)``, where ``kind`` is one of :data:`CHANGED`,
+        :data:`INSERTED` or :data:`REMOVED` and ``first`` and ``last`` are
+        inclusive. Returns ``None`` if the event may affect any index.
+
+        """
+        return None
+
     def removeListeners(self, *names):
         if not names:
             names = self.listeners.keys()
 
         for name in names:
-            l = self.listeners.pop(name)
+            l = self.listeners.pop(name, None)
             if l:
                 l.unlisten()
@@ -5,9 +5,9 @@ built-in Swing components.
 """
 from __future__ import unicode_literals
 
-from ...events import (addPropertyListener, addEventListener,
-                       addRowSorterListener)
-from . import BindingAdapter, registry
+from ...events import (addPropertyListener, addSharedPropertyListener,
+                       addEventListener, addRowSorterListener)
+from . import BindingAdapter, registry, CHANGED, INSERTED, REMOVED
 
 
 @registry.registerDefaultPropertyAdapter
@@ -17,16 +17,25 @@ class JavaBeansPropertyAdapter(BindingAdapter):
     (addPropertyListener, removePropertyListener) to listen to changes to the
     given property.
 
+    :ivar shareListeners: ``True`` if a single property change listener
+        should be shared by all bindings listening to the same property of
+        the same object. Default is ``True``.
+
     """
-    __slots__ = 'property'
+    __slots__ = ('property', 'shareListeners')
 
     def __init__(self, options, property=None):
         BindingAdapter.__init__(self, options)
         self.property = property
+        self.shareListeners = options.get('shareListeners', True)
 
     def addListeners(self, parent, callback, *args, **kwargs):
-        self.listeners['property'] = addPropertyListener(
-            parent, self.property, callback, *args, **kwargs)
+        if self.shareListeners:
+            self.listeners['property'] = addSharedPropertyListener(
+                parent, self.property, callback, *args, **kwargs)
+        else:
+            self.listeners['property'] = addPropertyListener(
+                parent, self.property, callback, *args, **kwargs)
 
 
 @registry.registerPropertyAdapter
@@ -283,6 +292,16 @@ class ListModelAdapter(JavaBeansPropertyAdapter):
         self.listeners['list'] = addEventListener(
             parent, ListDataListener, events, callback, *args, **kwargs)
 
+    def getChangedRange(self, event):
+        from javax.swing.event import ListDataEvent
+        if event.index0 < 0:
+            return None
+
+        kind = {ListDataEvent.CONTENTS_CHANGED: CHANGED,
+                ListDataEvent.INTERVAL_ADDED: INSERTED,
+                ListDataEvent.INTERVAL_REMOVED: REMOVED}[event.type]
+        return kind, event.index0, event.index1
+
 
 @registry.registerListAdapter
 @registry.registerPropertyAdapter
@@ -296,3 +315,14 @@ class TableModelAdapter(JavaBeansPropertyAdapter):
         self.listeners['table'] = addEventListener(
             parent, TableModelListener, 'tableChanged', callback, *args,
             **kwargs)
+
+    def getChangedRange(self, event):
+        from javax.swing.event import TableModelEvent
+        if event.firstRow < 0:
+            # The table structure has changed
+            return None
+
+        kind = {TableModelEvent.UPDATE: CHANGED,
+                TableModelEvent.INSERT: INSERTED,
+                TableModelEvent.DELETE: REMOVED}[event.type]
+        return kind, event.firstRow, event.lastRow
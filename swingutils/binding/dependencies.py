@@ -0,0 +1,118 @@
+"""
+Dependency analysis between bindings. A binding depends on another binding if
+the other one writes to a property path that the first one reads, so the
+other one must be synchronized first for the first one to see a consistent
+state.
+
+The nodes of a dependency graph are ``(binding, reverse)`` tuples, since the
+read and write sets of a two-way binding depend on the direction of the
+synchronization.
+
+"""
+from __future__ import unicode_literals
+
+
+def pathsOverlap(keys, otherKeys):
+    """
+    Returns ``True`` if either of the given key paths is a prefix of the
+    other (that is, writing to one can change the value read from the other).
+
+    """
+    length = min(len(keys), len(otherKeys))
+    return keys[:length] == otherKeys[:length]
+
+
+def buildDependencyGraph(nodes):
+    """
+    Builds a dependency graph between the given nodes.
+
+    :param nodes: an iterable of ``(binding, reverse)`` tuples
+    :return: a dictionary mapping each node to the set of nodes that depend
+        on it
+
+    """
+    # Index the read paths by the object they start from and the first key
+    readsByKey = {}  # (id(object), first key) -> [(node, keys)]
+    readsByObject = {}  # id(object) -> [(node, keys)]
+    writes = []
+    for node in nodes:
+        readPaths, writePaths = node[0].getPaths(node[1])
+        for obj, keys in readPaths:
+            readsByObject.setdefault(id(obj), []).append((node, keys))
+            firstKey = keys[0] if keys else None
+            readsByKey.setdefault((id(obj), firstKey), []).append(
+                (node, keys))
+        writes.append((node, writePaths))
+
+    graph = dict((node, set()) for node, _ in writes)
+    for node, writePaths in writes:
+        for obj, keys in writePaths:
+            if keys:
+                candidates = (readsByKey.get((id(obj), keys[0]), []) +
+                              readsByKey.get((id(obj), None), []))
+            else:
+                candidates = readsByObject.get(id(obj), ())
+
+            for other, otherKeys in candidates:
+                if other[0] is not node[0] and pathsOverlap(keys, otherKeys):
+                    graph[node].add(other)
+
+    return graph
+
+
+def findReachable(graph, node):
+    """Returns the set of nodes reachable from the given node."""
+
+    reachable = set()
+    stack = list(graph.get(node, ()))
+    while stack:
+        other = stack.pop()
+        if other not in reachable:
+            reachable.add(other)
+            stack.extend(graph.get(other, ()))
+
+    return reachable
+
+
+def findCycles(graph):
+    """
+    Finds the strongly connected components of the graph that contain more
+    than one node (using Tarjan's algorithm).
+
+    :return: a list of lists of nodes
+
+    """
+    indices = {}
+    lowlinks = {}
+    stack = []
+    onStack = set()
+    cycles = []
+
+    def strongConnect(node):
+        indices[node] = lowlinks[node] = len(indices)
+        stack.append(node)
+        onStack.add(node)
+        for other in graph.get(node, ()):
+            if other not in indices:
+                strongConnect(other)
+                lowlinks[node] = min(lowlinks[node], lowlinks[other])
+            elif other in onStack:
+                lowlinks[node] = min(lowlinks[node], indices[other])
+
+        if lowlinks[node] == indices[node]:
+            component = []
+            while True:
+                other = stack.pop()
+                onStack.discard(other)
+                component.append(other)
+                if other == node:
+                    break
+            if len(component) > 1:
+                component.reverse()
+                cycles.append(component)
+
+    for node in graph:
+        if node not in indices:
+            strongConnect(node)
+
+    return cycles
@@ -0,0 +1,190 @@
+"""
+Exports the structure of live binding groups (their bindings, binding chains,
+adapters and event listeners) as plain data structures, JSON or Graphviz DOT,
+for analyzing the listener load of a running application.
+
+"""
+from __future__ import unicode_literals
+import json
+
+from swingutils.binding import getLiveGroups
+
+
+def _describeObject(obj):
+    cls = obj.__class__
+    return {'id': id(obj), 'class': '%s.%s' % (cls.__module__, cls.__name__)}
+
+
+def _getStats(stats):
+    if stats is None:
+        return None
+    return dict((name, getattr(stats, name)) for name in stats.__slots__)
+
+
+def _exportNode(node, listenerCounts):
+    adapter = node.adapter
+    parent = node.lastParentRef() if node.lastParentRef else None
+    entry = {
+        'id': id(node),
+        'type': node.__class__.__name__,
+        'label': unicode(node),
+        'object': _describeObject(parent) if parent is not None else None,
+        'adapter': adapter.__class__.__name__ if adapter else None,
+        'listeners': sorted(adapter.listeners.keys()) if adapter else [],
+        'children': [_exportNode(child, listenerCounts)
+                     for child in node.children]
+    }
+
+    if adapter and parent is not None:
+        key = id(parent), getattr(node, 'attr', None), entry['adapter']
+        counts = listenerCounts.get(key)
+        if counts is None:
+            counts = listenerCounts[key] = dict(
+                entry['object'], property=key[1], adapter=key[2],
+                listeners=0, nodes=0)
+        counts['listeners'] += len(entry['listeners'])
+        counts['nodes'] += 1
+
+    return entry
+
+
+def _exportExpression(expression, listenerCounts):
+    root = expression.root
+    return {
+        'source': expression.source,
+        'root': _describeObject(root) if root is not None else None,
+        'bound': expression.bound,
+        'chains': [_exportNode(node, listenerCounts)
+                   for node in expression.chains or ()],
+        'stats': _getStats(expression.stats)
+    }
+
+
+def exportGroups(groups=None):
+    """
+    Exports the given binding groups as a dictionary of plain data (lists,
+    dictionaries, strings and numbers) with the following keys:
+
+    * ``groups``: a list of groups, each with a list of ``bindings``
+      containing the source and target expressions with their binding
+      chains, the adapters and event listeners of each chain node and the
+      instrumentation counters (if the ``instrument`` option was used)
+    * ``listenerCounts``: the number of event listeners and chain nodes per
+      listened object and property, most listeners first. Several nodes on
+      the same object and property point to duplicate listeners.
+
+    Objects are identified by their :func:`id`.
+
+    :param groups: an iterable of binding groups (default: every group with
+        bound bindings; see :func:`~swingutils.binding.getLiveGroups`)
+
+    """
+    if groups is None:
+        groups = getLiveGroups()
+
+    listenerCounts = {}
+    exportedGroups = []
+    for group in groups:
+        bindings = []
+        for b in group.bindings:
+            bindings.append({
+                'id': id(b),
+                'mode': b.mode,
+                'source': _exportExpression(b.sourceExpression,
+                                            listenerCounts),
+                'target': _exportExpression(b.targetExpression,
+                                            listenerCounts),
+                'skippedWrites': b.skippedWrites,
+                'stats': _getStats(b.stats)
+            })
+        exportedGroups.append({'id': id(group), 'bindings': bindings})
+
+    counts = sorted(listenerCounts.values(),
+                    key=lambda entry: entry['listeners'], reverse=True)
+    return {'groups': exportedGroups, 'listenerCounts': counts}
+
+
+def exportJSON(groups=None, outfile=None, **kwargs):
+    """
+    Exports the given binding groups as JSON (see :func:`exportGroups`).
+    Extra keyword arguments are passed to :func:`json.dumps`.
+
+    :param outfile: a file to write the JSON to
+    :return: the JSON string if no `outfile` was given
+
+    """
+    kwargs.setdefault('indent', 2)
+    kwargs.setdefault('sort_keys', True)
+    data = exportGroups(groups)
+    if outfile:
+        json.dump(data, outfile, **kwargs)
+    else:
+        return json.dumps(data, **kwargs)
+
+
+def _quote(*lines):
+    escaped = [line.replace('\\', '\\\\').replace('"', '\\"')
+               for line in lines]
+    return '"%s"' % '\\n'.join(escaped)
+
+
+def exportDOT(groups=None, outfile=None):
+    """
+    Exports the given binding groups as a Graphviz DOT graph. Each binding
+    group is drawn as a cluster of binding chains, with dashed edges from
+    chain nodes to the objects they listen to. Objects listened to by more
+    than one chain node are highlighted.
+
+    :param outfile: a file to write the graph to
+    :return: the DOT source if no `outfile` was given
+
+    """
+    data = exportGroups(groups)
+    lines = ['digraph bindings {', '  rankdir=LR;',
+             '  node [shape=box, fontsize=10];']
+    objects = {}
+    edges = []
+
+    def addNode(node, indent):
+        labelLines = [node['label']]
+        if node['listeners']:
+            labelLines.append('%s: %s' % (node['adapter'],
+                                          ', '.join(node['listeners'])))
+        lines.append('%sn%d [label=%s];' % (indent, node['id'],
+                                            _quote(*labelLines)))
+        if node['object'] and node['adapter']:
+            objects[node['object']['id']] = node['object']['class']
+            edges.append('  n%d -> o%d [style=dashed];' % (
+                node['id'], node['object']['id']))
+        for child in node['children']:
+            addNode(child, indent)
+            edges.append('  n%d -> n%d;' % (node['id'], child['id']))
+
+    for group in data['groups']:
+        lines.append('  subgraph cluster_g%d {' % group['id'])
+        lines.append('    label=%s;' % _quote('BindingGroup %x' %
+                                              group['id']))
+        for binding in group['bindings']:
+            lines.append('    subgraph cluster_b%d {' % binding['id'])
+            lines.append('      label=%s;' % _quote('%s -> %s' % (
+                binding['source']['source'], binding['target']['source'])))
+            for side in ('source', 'target'):
+                for node in binding[side]['chains']:
+                    addNode(node, '      ')
+            lines.append('    }')
+        lines.append('  }')
+
+    duplicated = set(entry['id'] for entry in data['listenerCounts']
+                     if entry['nodes'] > 1)
+    for objId, className in sorted(objects.items()):
+        attrs = ', color=red' if objId in duplicated else ''
+        lines.append('  o%d [label=%s, shape=ellipse%s];' % (
+            objId, _quote('%s %x' % (className, objId)), attrs))
+
+    lines.extend(edges)
+    lines.append('}')
+    dot = '\n'.join(lines) + '\n'
+    if outfile:
+        outfile.write(dot)
+    else:
+        return dot
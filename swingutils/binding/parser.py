@@ -1,14 +1,349 @@
 from __future__ import unicode_literals
+from collections import OrderedDict
+from threading import Lock, local
+from operator import attrgetter, itemgetter
+import __builtin__
 import ast
 import weakref
 
-from .adapters import registry
+from .adapters import registry, CHANGED
+
+
+class CompiledExpression(object):
+    """
+    Holds the parsed syntax tree and the compiled reader and writer code
+    objects for a single binding expression. Each of these is produced on
+    first use.
+
+    Instances are shared between all binding expressions that have the same
+    source code, so they must never hold any per-binding state.
+
+    """
+    __slots__ = ('source', '_tree', '_reader', '_writer', '_templates',
+                 '_trie', '_paths', '_accessor')
+
+    def __init__(self, source):
+        self.source = source
+        self._tree = None
+        self._reader = None
+        self._writer = None
+        self._templates = None
+        self._trie = None
+        self._paths = None
+        self._accessor = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = ast.parse(self.source, '$$binding-expression$$',
+                                   'eval')
+        return self._tree
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = compile(self.source, '$$binding-reader$$', 'eval')
+        return self._reader
+
+    @property
+    def writer(self):
+        if self._writer is None:
+            self._writer = compile('%s=___binding_value' % self.source,
+                                   '$$binding-writer$$', 'exec')
+        return self._writer
+
+    @property
+    def accessor(self):
+        """
+        A :class:`~PathAccessor` for this expression if it's a simple path
+        (like ``customer.address.city`` or ``items[0].name``), ``None``
+        otherwise.
+
+        """
+        if self._accessor is None:
+            try:
+                self._accessor = PathAccessor.fromTree(self.tree) or False
+            except SyntaxError:
+                self._accessor = False
+        return self._accessor or None
+
+    @property
+    def templates(self):
+        """
+        The chain templates of this expression as a tuple of tuples of
+        :class:`~NodeTemplate` objects (ordered from the root to the leaf).
+
+        """
+        if self._templates is None:
+            visitor = ChainVisitor()
+            visitor.visit(self.tree)
+            self._templates = tuple(visitor.chains)
+        return self._templates
+
+    @property
+    def trie(self):
+        """
+        The chain templates of this expression merged into a prefix trie (see
+        :func:`~mergeChains`).
+
+        """
+        if self._trie is None:
+            self._trie = mergeChains(self.templates)
+        return self._trie
+
+    @property
+    def paths(self):
+        """
+        The property paths read by this expression, as a tuple of ``(name,
+        keys)`` tuples where ``name`` is the name at the start of the path and
+        ``keys`` is a tuple of the keys of the chain templates following it.
+
+        """
+        if self._paths is None:
+            self._paths = tuple(
+                (templates[0].name,
+                 tuple(template.key for template in templates[1:]))
+                for templates in iterTemplatePaths(self.trie))
+        return self._paths
+
+    def analyze(self):
+        """
+        Parses the expression and builds its chain templates and property
+        paths right away instead of when they are first needed.
+
+        """
+        return self.paths
+
+    def createChains(self, callback, locals_, options):
+        """
+        Creates a fresh set of binding chains from the chain templates of this
+        expression. Chains that share a common prefix (like ``order.customer``
+        in ``order.customer.name + order.customer.surname``) share the nodes
+        of that prefix.
+
+        :return: list of the root nodes of the chains
+
+        """
+        return instantiateChains(self.trie, callback, locals_, options)
+
+
+class CompiledDependencies(CompiledExpression):
+    """
+    Holds the combined chain templates of the dependency paths given for a
+    callable binding expression. Only the templates and what is derived from
+    them are available, since the callable takes care of reading and writing
+    the value.
+
+    """
+    __slots__ = ('sources',)
+
+    def __init__(self, sources):
+        if isinstance(sources, basestring):
+            sources = (sources,)
+        self.sources = tuple(sources)
+        CompiledExpression.__init__(self, ', '.join(self.sources))
+
+    @property
+    def templates(self):
+        if self._templates is None:
+            self._templates = tuple(
+                chain for source in self.sources
+                for chain in expressionCache.get(source).templates)
+        return self._templates
+
+    @property
+    def accessor(self):
+        return None
+
+
+class PathAccessor(object):
+    """
+    Reads and writes simple path expressions directly, without going through
+    :func:`eval`. A simple path is a name followed by any number of attribute
+    accesses and subscripts with a constant (number or string) key.
+
+    Names are resolved like the binding expressions themselves resolve them:
+    first from the binding variables, then as attributes of the root object
+    and finally from the builtins.
+
+    """
+    __slots__ = ('name', 'steps', 'getters', 'pathGetter')
+
+    def __init__(self, name, steps):
+        self.name = name
+        self.steps = steps  # tuple of (isAttribute, attribute name or key)
+
+        # Precompute getters for following the path from the first object,
+        # merging consecutive attribute accesses into a single attrgetter
+        getters = []
+        attrs = []
+        for isAttribute, key in steps:
+            if isAttribute:
+                attrs.append(key)
+            else:
+                if attrs:
+                    getters.append(attrgetter('.'.join(attrs)))
+                    del attrs[:]
+                getters.append(itemgetter(key))
+        if attrs:
+            getters.append(attrgetter('.'.join(attrs)))
+        self.getters = tuple(getters)
+
+        # Pure attribute paths can be followed straight from the root object
+        # as long as the name resolves to one of its attributes
+        self.pathGetter = None
+        if all(isAttribute for isAttribute, key in steps):
+            self.pathGetter = attrgetter(
+                '.'.join((name,) + tuple(key for _, key in steps)))
+
+    @classmethod
+    def fromTree(cls, tree):
+        """
+        Creates an accessor for the given expression tree, or returns ``None``
+        if the expression is not a simple path.
+
+        """
+        steps = []
+        node = tree.body
+        while not isinstance(node, ast.Name):
+            if isinstance(node, ast.Attribute):
+                steps.append((True, node.attr))
+            elif (isinstance(node, ast.Subscript) and
+                    isinstance(node.slice, ast.Index)):
+                key = node.slice.value
+                if isinstance(key, ast.Num):
+                    steps.append((False, key.n))
+                elif isinstance(key, ast.Str):
+                    steps.append((False, key.s))
+                elif (isinstance(key, ast.UnaryOp) and
+                        isinstance(key.op, ast.USub) and
+                        isinstance(key.operand, ast.Num)):
+                    steps.append((False, -key.operand.n))
+                else:
+                    return None
+            else:
+                return None
+            node = node.value
+
+        steps.reverse()
+        return cls(node.id, tuple(steps))
+
+    def lookupName(self, root, vars):
+        if self.name in vars:
+            return vars[self.name]
+
+        try:
+            return getattr(root, self.name)
+        except AttributeError:
+            pass
+
+        try:
+            return getattr(__builtin__, self.name)
+        except AttributeError:
+            raise NameError('name \'%s\' is not defined' % self.name)
+
+    def getValue(self, root, vars):
+        if self.pathGetter and self.name not in vars:
+            try:
+                return self.pathGetter(root)
+            except AttributeError:
+                # Fall back to the full lookup if the name was not found on
+                # the root object
+                if hasattr(root, self.name):
+                    raise
+
+        obj = self.lookupName(root, vars)
+        for getter in self.getters:
+            obj = getter(obj)
+        return obj
+
+    def setValue(self, root, vars, value):
+        if not self.steps:
+            # Assignments to bare names always go to the root object
+            setattr(root, self.name, value)
+            return
+
+        obj = self.lookupName(root, vars)
+        for isAttribute, key in self.steps[:-1]:
+            obj = getattr(obj, key) if isAttribute else obj[key]
+
+        isAttribute, key = self.steps[-1]
+        if isAttribute:
+            setattr(obj, key, value)
+        else:
+            obj[key] = value
+
+
+class ExpressionCache(object):
+    """
+    A size limited, least recently used cache of
+    :class:`~CompiledExpression` objects, keyed by expression source code.
+
+    :ivar maxsize: the maximum number of expressions to keep
+    :ivar hits: number of lookups that found an existing entry
+    :ivar misses: number of lookups that had to create a new entry
+
+    """
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, source):
+        """
+        Returns the compiled expression for the given source code, creating
+        it if necessary.
+
+        :rtype: :class:`~CompiledExpression`
+
+        """
+        with self._lock:
+            compiled = self._entries.pop(source, None)
+            if compiled is None:
+                self.misses += 1
+                compiled = CompiledExpression(source)
+                while len(self._entries) >= self.maxsize > 0:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+
+            if self.maxsize > 0:
+                self._entries[source] = compiled
+            return compiled
+
+    def clear(self):
+        """Removes all entries from the cache and resets the statistics."""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+expressionCache = ExpressionCache()
+
+# Holds the event currently being handled by a binding node, per thread
+_dispatchState = local()
+
+
+def getCurrentEvent():
+    """
+    Returns the change event that triggered the binding callback currently
+    being run in this thread, or ``None`` if the callback was not triggered
+    directly by an event (for example, by a change in a subscript index).
+
+    """
+    return getattr(_dispatchState, 'event', None)
 
 
 class BindingNode(object):
     adapter = None
-    next = None
+    children = ()
     lastParentRef = None
+    stats = None
 
     def __init__(self, callback, locals_, options):
         self.callback = callback
@@ -44,25 +379,80 @@ class BindingNode(object):
     def handleEvent(self, event=None):
         if self.logger:
             self.logger.debug('%s: change event triggered' % self)
+        if self.stats:
+            self.stats.events += 1
 
-        self.callback()
-
-        if self.next:
-            # Remove existing bindings from the next element onwards
-            self.next.unbind()
+        previousEvent = getattr(_dispatchState, 'event', None)
+        _dispatchState.event = event
+        try:
+            self.callback()
+        finally:
+            _dispatchState.event = previousEvent
 
+        if self.children:
             # Get the new value for this node using the last bound parent,
             # if it still exists
+            value = None
             if self.lastParentRef:
                 parent = self.lastParentRef()
                 if parent:
                     value = self.checkedGetValue(parent)
-                    if value is not None:
-                        self.next.bind(value)
                 else:
                     del self.lastParentRef
 
+            # Move the child nodes over to the new value; this is a no-op for
+            # children whose parent did not change
+            rebound = False
+            for child in self.children:
+                rebound |= child.rebind(value)
+
+            if rebound and self.stats:
+                self.stats.rebinds += 1
+
+    def rebind(self, parent):
+        """
+        Moves this node's event listeners over to a new parent, unless it is
+        already bound to that very object. Either way, the node's value is
+        then read again and the nodes further down the chain are rebound to
+        it, since the value may have changed without an event of its own
+        (like an item of a plain list). Nodes whose parent stays the same
+        object keep their listeners.
+
+        :param parent: the new parent object, or ``None`` to just unbind
+        :return: ``True`` if this node or any node further down the chain was
+            rebound, ``False`` if nothing was changed
+
+        """
+        lastParent = self.lastParentRef() if self.lastParentRef else None
+        rebound = parent is not lastParent
+        if rebound:
+            self.removeListeners()
+            if parent is not None:
+                self.addListeners(parent)
+
+        if self.children:
+            value = self.checkedGetValue(parent) if parent is not None \
+                else None
+            for child in self.children:
+                rebound |= child.rebind(value)
+        return rebound
+
     def bind(self, parent):
+        self.addListeners(parent)
+        if self.children:
+            value = self.checkedGetValue(parent)
+            if value is not None:
+                for child in self.children:
+                    child.bind(value)
+
+    def unbind(self):
+        self.removeListeners()
+        for child in self.children:
+            child.unbind()
+
+    def addListeners(self, parent):
+        """Adds the event listeners of this node alone to `parent`."""
+
         if self.logger:
             self.logger.debug('%s: adding event listeners (parent=%s)', self,
                               parent)
@@ -82,19 +472,14 @@ class BindingNode(object):
                 if not self.options['ignoreErrors']:
                     raise
 
-        if self.next:
-            value = self.checkedGetValue(parent)
-            if value is not None:
-                self.next.bind(value)
+    def removeListeners(self):
+        """Removes the event listeners of this node alone."""
 
-    def unbind(self):
         if self.lastParentRef:
             del self.lastParentRef
         if self.adapter:
             self.adapter.removeListeners()
             del self.adapter
-        if self.next:
-            self.next.unbind()
 
 
 class AttributeNode(BindingNode):
@@ -133,22 +518,78 @@ class VariableNode(BindingNode):
 
 
 class SubscriptNode(BindingNode):
-    __slots__ = 'code'
+    """
+    A subscript of the parent value. If the adapter can tell which indices
+    were affected by a change event, events that cannot affect the value at
+    the current (non-negative integer) index are ignored.
+
+    :ivar lastKey: the index evaluated when the node was last bound, or
+        ``None`` if it is not a non-negative integer
 
-    def __init__(self, node, callback, locals_, options):
+    """
+    __slots__ = ('template', 'lastKey')
+
+    def __init__(self, template, callback, locals_, options):
         BindingNode.__init__(self, callback, locals_, options)
-        value = ast.Name(id='___binding_parent')
-        subscript = ast.Subscript(value=value, slice=node.slice)
-        expr = ast.Expression(body=subscript)
-        self.code = compile(expr, '$$binding-subscript$$', 'eval')
+        self.template = template
+        self.lastKey = None
 
     def getValue(self, parent):
-        slice = eval(self.code, self.locals_, dict(___binding_parent=parent))
-        return parent[slice]
+        result = eval(self.template.code, self.locals_,
+                      dict(___binding_parent=parent))
+        return parent[result] if self.template.keyed else result
 
     def getAdapter(self, parent):
         return registry.getListAdapter(parent, self.options)
 
+    def updateKey(self, parent):
+        self.lastKey = None
+        if self.template.keyed:
+            try:
+                key = eval(self.template.code, self.locals_,
+                           dict(___binding_parent=parent))
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                return
+
+            if isinstance(key, (int, long)) and not isinstance(key, bool) \
+                    and key >= 0:
+                self.lastKey = key
+
+    def isAffectedBy(self, event):
+        if self.lastKey is None or not self.adapter:
+            return True
+
+        changedRange = self.adapter.getChangedRange(event)
+        if changedRange is None:
+            return True
+
+        # Insertions and removals shift every index from the first one
+        # onwards, so only plain changes have an upper bound
+        kind, first, last = changedRange
+        if kind == CHANGED:
+            return first <= self.lastKey <= last
+        return first <= self.lastKey
+
+    def handleEvent(self, event=None):
+        if event is None:
+            # Triggered by a subchain, so the key itself may have changed
+            parent = self.lastParentRef() if self.lastParentRef else None
+            if parent is not None:
+                self.updateKey(parent)
+        elif not self.isAffectedBy(event):
+            if self.logger:
+                self.logger.debug('%s: ignoring change event outside index '
+                                  '%s', self, self.lastKey)
+            return
+
+        BindingNode.handleEvent(self, event)
+
+    def addListeners(self, parent):
+        self.updateKey(parent)
+        BindingNode.addListeners(self, parent)
+
     def __unicode__(self):
         if self.adapter and not isinstance(
                 self.adapter, registry.defaultListAdapter):
@@ -158,21 +599,188 @@ class SubscriptNode(BindingNode):
 
 
 class CallNode(BindingNode):
-    __slots__ = 'code'
+    __slots__ = 'template'
 
-    def __init__(self, node, callback, locals_, options):
+    def __init__(self, template, callback, locals_, options):
         BindingNode.__init__(self, callback, locals_, options)
+        self.template = template
+
+    def getValue(self, parent):
+        return eval(self.template.code, self.locals_,
+                    dict(___binding_parent=parent))
+
+    def __unicode__(self):
+        return 'Call'
+
+
+class NodeTemplate(object):
+    """
+    Immutable description of a single node in a binding chain. Templates are
+    created once per distinct expression and are shared by every binding
+    chain created from that expression.
+
+    :ivar key: hashable value that is equal for templates that produce
+        identical nodes, used to merge common chain prefixes
+    :ivar subchains: trie of chain templates (see :func:`~mergeChains`) whose
+        changes affect the value of this node (like the index in a subscript
+        or the arguments of a call)
+
+    """
+    __slots__ = ()
+    subchains = ()
+
+    def instantiate(self, callback, locals_, options):
+        raise NotImplementedError
+
+
+class NameTemplate(NodeTemplate):
+    """
+    A name at the start of a chain. Names are looked up in the binding
+    variables first, and then as attributes of the root object.
+
+    """
+    __slots__ = 'name'
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def key(self):
+        return 'name', self.name
+
+    def instantiate(self, callback, locals_, options):
+        if self.name in locals_.vars:
+            return VariableNode(self.name, callback, locals_, options)
+        return AttributeNode(self.name, callback, locals_, options)
+
+
+class AttributeTemplate(NodeTemplate):
+    __slots__ = 'attr'
+
+    def __init__(self, attr):
+        self.attr = attr
+
+    @property
+    def key(self):
+        return 'attr', self.attr
+
+    def instantiate(self, callback, locals_, options):
+        return AttributeNode(self.attr, callback, locals_, options)
+
+
+class SubscriptTemplate(NodeTemplate):
+    """
+    :ivar code: code object that evaluates to the subscript key (if `keyed` is
+        ``True``) or to the subscripted value itself (for slices)
+
+    """
+    __slots__ = ('code', 'keyed', 'key', 'subchains')
+
+    def __init__(self, node, subchains):
+        self.key = 'subscript', ast.dump(node.slice)
+        if isinstance(node.slice, ast.Index):
+            body = node.slice.value
+            self.keyed = True
+        else:
+            value = ast.Name(id='___binding_parent', ctx=ast.Load())
+            body = ast.Subscript(value=value, slice=node.slice,
+                                 ctx=ast.Load())
+            self.keyed = False
+
+        expr = ast.Expression(body=body)
+        self.code = compile(expr, '$$binding-subscript$$', 'eval')
+        self.subchains = mergeChains(subchains)
+
+    def instantiate(self, callback, locals_, options):
+        return SubscriptNode(self, callback, locals_, options)
+
+
+class CallTemplate(NodeTemplate):
+    __slots__ = ('code', 'key', 'subchains')
+
+    def __init__(self, node, subchains):
         func = ast.Name(id='___binding_parent', ctx=ast.Load())
         call = ast.Call(func=func, args=node.args, keywords=node.keywords,
                         starargs=node.starargs, kwargs=node.kwargs)
+        self.key = 'call', ast.dump(call)
         expr = ast.Expression(body=call)
         self.code = compile(expr, '$$binding-call$$', 'eval')
+        self.subchains = mergeChains(subchains)
 
-    def getValue(self, parent):
-        return eval(self.code, self.locals_, dict(___binding_parent=parent))
+    def instantiate(self, callback, locals_, options):
+        return CallNode(self, callback, locals_, options)
 
-    def __unicode__(self):
-        return 'Call'
+
+def mergeChains(chains):
+    """
+    Merges chain templates that share a common prefix into a trie, so that
+    the nodes of the common prefix are only created (and listened to) once
+    per binding. Templates are considered equal if their ``key`` attributes
+    are equal.
+
+    :param chains: an iterable of chain templates (tuples of
+        :class:`~NodeTemplate`, ordered from the root to the leaf)
+    :return: a tuple of ``(template, children)`` pairs where ``children`` is
+        a trie of the same form
+
+    """
+    branches = OrderedDict()
+    for chain in chains:
+        if chain:
+            template = chain[0]
+            branches.setdefault(template.key, (template, []))[1].append(
+                chain[1:])
+
+    return tuple((template, mergeChains(rests))
+                 for template, rests in branches.values())
+
+
+def iterTemplatePaths(trie, prefix=()):
+    """
+    Iterates through every path from a root to a leaf in the given trie of
+    chain templates, including the paths in subchains.
+
+    :return: an iterator of tuples of :class:`~NodeTemplate`
+
+    """
+    for template, children in trie:
+        path = prefix + (template,)
+        for subpath in iterTemplatePaths(template.subchains):
+            yield subpath
+
+        if children:
+            for subpath in iterTemplatePaths(children, path):
+                yield subpath
+        else:
+            yield path
+
+
+def instantiateChains(trie, callback, locals_, options):
+    """
+    Creates binding chains from the given trie of chain templates. Nodes with
+    subchains get their own chains for them, with the node's
+    ``handleEvent`` as the callback.
+
+    :return: list of the root nodes of each chain
+
+    """
+    chains = []
+
+    def instantiate(branches):
+        nodes = []
+        for template, children in branches:
+            node = template.instantiate(callback, locals_, options)
+            if template.subchains:
+                chains.extend(instantiateChains(
+                    template.subchains, node.handleEvent, locals_, options))
+            if children:
+                node.children = instantiate(children)
+            nodes.append(node)
+
+        return tuple(nodes)
+
+    chains.extend(instantiate(trie))
+    return chains
 
 
 class NameCollector(ast.NodeVisitor):
@@ -184,69 +792,61 @@ class NameCollector(ast.NodeVisitor):
 
 
 class ChainVisitor(ast.NodeVisitor):
-    def __init__(self, callback, locals_, options):
-        self.callback = callback
-        self.locals_ = locals_
-        self.options = options
+    """
+    Analyzes an expression's syntax tree into chain templates. Each chain is
+    a tuple of :class:`~NodeTemplate` objects, ordered from the root to the
+    leaf.
+
+    """
+    def __init__(self):
         self.chains = []
         self.excludedNames = set()
-        self.lastNode = None
+        self.pending = ()
 
-    def addNode(self, node):
-        node.next = self.lastNode
-        self.lastNode = node
+    def addNode(self, template):
+        self.pending = (template,) + self.pending
 
-    def subnodeVisit(self, node, callback):
+    def subnodeVisit(self, node):
         if isinstance(node, list):
-            for item in node:
-                self.subnodeVisit(item, callback)
+            return sum((self.subnodeVisit(item) for item in node), ())
         elif isinstance(node, ast.AST):
-            visitor = ChainVisitor(callback, self.locals_, self.options)
+            visitor = ChainVisitor()
             visitor.visit(node)
-            self.chains.extend(visitor.chains)
+            return tuple(visitor.chains)
+        return ()
 
     def visit_Name(self, node):
         # Names are treated as attributes of the root object
-        if node.id in self.locals_.vars:
-            bindingNode = VariableNode(node.id, self.callback, self.locals_,
-                                       self.options)
-        elif node.id not in self.excludedNames:
-            bindingNode = AttributeNode(node.id, self.callback, self.locals_,
-                                        self.options)
-        else:
+        if node.id in self.excludedNames:
             return
 
-        self.addNode(bindingNode)
+        self.addNode(NameTemplate(node.id))
 
         # Finish this chain and start a new one
-        self.chains.append(self.lastNode)
-        self.lastNode = None
+        self.chains.append(self.pending)
+        self.pending = ()
 
     def visit_Str(self, node):
-        self.lastNode = None
+        self.pending = ()
         self.generic_visit(node)
 
     def visit_Attribute(self, node):
-        self.addNode(AttributeNode(node.attr, self.callback, self.locals_,
-                                   self.options))
+        self.addNode(AttributeTemplate(node.attr))
         self.visit(node.value)
 
     def visit_Subscript(self, node):
-        bindingNode = SubscriptNode(node, self.callback, self.locals_,
-                                    self.options)
-        self.addNode(bindingNode)
-        self.subnodeVisit(node.slice, bindingNode.handleEvent)
+        subchains = self.subnodeVisit(node.slice)
+        self.addNode(SubscriptTemplate(node, subchains))
         self.visit(node.value)
 
     def visit_Call(self, node):
-        bindingNode = CallNode(node, self.callback, self.locals_,
-                               self.options)
-        self.addNode(bindingNode)
+        subchains = ()
         for key, value in ast.iter_fields(node):
-            if key == 'func':
-                self.visit(value)
-            elif value:
-                self.subnodeVisit(value, bindingNode.handleEvent)
+            if key != 'func' and value:
+                subchains += self.subnodeVisit(value)
+
+        self.addNode(CallTemplate(node, subchains))
+        self.visit(node.func)
 
     def visit_Lambda(self, node):
         collector = NameCollector()
@@ -262,7 +862,8 @@ class ChainVisitor(ast.NodeVisitor):
             self.excludedNames.update(visitor.names)
             for key, value in ast.iter_fields(comprehension):
                 if key != 'target':
-                    self.visit(value)
+                    for item in value if isinstance(value, list) else [value]:
+                        self.visit(item)
 
         self.visit(node.elt)
         self.excludedNames.clear()
@@ -271,7 +872,4 @@ class ChainVisitor(ast.NodeVisitor):
 
 
 def createChains(expr, callback, locals_, options):
-    root = ast.parse(expr, '$$binding-expression$$', 'eval')
-    visitor = ChainVisitor(callback, locals_, options)
-    visitor.visit(root)
-    return visitor.chains
+    return expressionCache.get(expr).createChains(callback, locals_, options)
@@ -0,0 +1,87 @@
+"""
+Optional instrumentation for bindings. Statistics are only collected for
+bindings created with the ``instrument`` option enabled; other bindings carry
+no extra overhead beyond a single attribute check per synchronization.
+
+"""
+from __future__ import unicode_literals
+
+from java.lang import System
+
+
+def clock():
+    """Returns the value of a high resolution timer in seconds."""
+
+    return System.nanoTime() / 1000000000.0
+
+
+class ExpressionStats(object):
+    """
+    Statistics for a single binding expression.
+
+    :ivar evaluations: number of times the expression was read
+    :ivar evaluationTime: total time (in seconds) spent reading
+    :ivar writes: number of times the expression was written to
+    :ivar writeTime: total time (in seconds) spent writing
+    :ivar errors: number of reads and writes that raised an exception
+    :ivar events: number of change events received by the binding chains
+    :ivar rebinds: number of times a binding chain was rebound from the
+        middle because an intermediate value changed
+
+    """
+    __slots__ = ('evaluations', 'evaluationTime', 'writes', 'writeTime',
+                 'errors', 'events', 'rebinds')
+
+    def __init__(self):
+        self.evaluations = 0
+        self.evaluationTime = 0.0
+        self.writes = 0
+        self.writeTime = 0.0
+        self.errors = 0
+        self.events = 0
+        self.rebinds = 0
+
+    def wrapReader(self, func):
+        def reader():
+            start = clock()
+            try:
+                return func()
+            except:
+                self.errors += 1
+                raise
+            finally:
+                self.evaluations += 1
+                self.evaluationTime += clock() - start
+        return reader
+
+    def wrapWriter(self, func):
+        def writer(value):
+            start = clock()
+            try:
+                func(value)
+            except:
+                self.errors += 1
+                raise
+            finally:
+                self.writes += 1
+                self.writeTime += clock() - start
+        return writer
+
+
+class BindingStats(object):
+    """
+    Statistics for a single binding.
+
+    :ivar syncs: number of synchronizations from source to target
+    :ivar reverseSyncs: number of synchronizations from target to source
+    :ivar syncTime: total time (in seconds) spent synchronizing
+    :ivar errors: number of synchronizations that failed to read or write
+
+    """
+    __slots__ = ('syncs', 'reverseSyncs', 'syncTime', 'errors')
+
+    def __init__(self):
+        self.syncs = 0
+        self.reverseSyncs = 0
+        self.syncTime = 0.0
+        self.errors = 0
@@ -1,21 +1,44 @@
 from __future__ import unicode_literals
+from collections import OrderedDict, deque
+from threading import Lock, local
+import logging
+import traceback
+import weakref
 
+from java.lang import System
 from java.util import EventListener
 
+from swingutils.threads.swing import runSwing, runSwingLater
+
+# Coalescing modes
+DEBOUNCE = 'debounce'
+THROTTLE = 'throttle'
+NEXT_CYCLE = 'nextCycle'
+
 _wrapperClassMap = {}  # event interface name -> wrapper class
+_wrapperClassCache = {}  # (interface, event name(s), base) -> wrapper class
+# (id(target), property) -> _PropertyMultiplexer; each multiplexer is kept
+# alive by the listener it has added to its target, not by this registry
+_multiplexers = weakref.WeakValueDictionary()
+_multiplexersLock = Lock()
+_groupState = local()  # holds the stack of active ListenerGroups per thread
 
 
 def _noOp(self, event):
     pass
 
 
-def _createListenerWrapper(eventInterface, eventNames, listener, args, kwargs,
-                           removeMethod):
+def _record(listener, target, eventInterface):
+    groups = getattr(_groupState, 'stack', None)
+    if groups:
+        groups[-1].add(listener, target, eventInterface)
+
+
+def _createWrapperClass(eventInterface, eventNames, baseClass):
     eventNames = ((eventNames,) if isinstance(eventNames, basestring) else
                   sorted(eventNames))
     assert issubclass(eventInterface, EventListener), \
         'eventName class must be a subclass of EventListener'
-    assert hasattr(listener, '__call__'), 'listener must be callable'
     for eventName in eventNames:
         assert hasattr(eventInterface, eventName), \
             '%s has no method named "%s"' % \
@@ -25,7 +48,8 @@ def _createListenerWrapper(eventInterface, eventNames, listener, args, kwargs,
     className = eventInterface.__name__
     if eventInterface.__module__:
         className = eventInterface.__module__ + '.' + className
-    mapKey = '%s/%s' % (className, ','.join(eventNames))
+    mapKey = '%s/%s/%s' % (className, ','.join(eventNames),
+                           baseClass.__name__)
 
     # Create a wrapper class for this eventName class if it's not there yet
     wrapperClass = _wrapperClassMap.get(mapKey)
@@ -39,16 +63,50 @@ def _createListenerWrapper(eventInterface, eventNames, listener, args, kwargs,
                                not m.startswith('_'))
 
         # Redirect all interface methods to self.handleEvent()
-        methods = {m: EventListenerWrapper.handleEvent
-                   if m in eventNames else _noOp for m in methodNames}
+        handleEvent = (_profiledHandleEvent if _profile.enabled else
+                       baseClass.handleEvent)
+        methods = {m: handleEvent if m in eventNames else _noOp
+                   for m in methodNames}
+        methods.update(__slots__=(), _eventNames=tuple(eventNames),
+                       _interfaceName=className)
         wrapperClass = type('%sWrapper' % eventInterface.__name__,
-                            (EventListenerWrapper, eventInterface), methods)
+                            (baseClass, eventInterface), methods)
         _wrapperClassMap[mapKey] = wrapperClass
 
+    return wrapperClass
+
+
+def _createListenerWrapper(eventInterface, eventNames, listener, args, kwargs,
+                           removeMethod):
+    assert hasattr(listener, '__call__'), 'listener must be callable'
+
+    # Pick the wrapper that passes on no more arguments than necessary
+    if kwargs:
+        baseClass = EventListenerWrapper
+    elif args:
+        baseClass = _PositionalArgsWrapper
+    else:
+        baseClass = _NoArgsWrapper
+
+    # The interface and event names are only validated when the wrapper class
+    # is first created for them
+    if isinstance(eventNames, basestring):
+        cacheKey = (eventInterface, eventNames, baseClass)
+    else:
+        cacheKey = (eventInterface, frozenset(eventNames), baseClass)
+    wrapperClass = _wrapperClassCache.get(cacheKey)
+    if wrapperClass is None:
+        wrapperClass = _createWrapperClass(eventInterface, eventNames,
+                                           baseClass)
+        _wrapperClassCache[cacheKey] = wrapperClass
+
     return wrapperClass(listener, args, kwargs, removeMethod)
 
 
 class EventListenerWrapper(object):
+    __slots__ = ('listener', 'args', 'kwargs', 'removeMethod',
+                 'removeMethodArgs', '__weakref__')
+
     def __init__(self, listener, args, kwargs, removeMethod):
         self.listener = listener
         self.args = args
@@ -63,6 +121,24 @@ class EventListenerWrapper(object):
         self.removeMethod(*self.removeMethodArgs)
 
 
+class _PositionalArgsWrapper(EventListenerWrapper):
+    """Wrapper for listeners with extra positional arguments only."""
+
+    __slots__ = ()
+
+    def handleEvent(self, event):
+        self.listener(event, *self.args)
+
+
+class _NoArgsWrapper(EventListenerWrapper):
+    """Wrapper for listeners that only take the event as an argument."""
+
+    __slots__ = ()
+
+    def handleEvent(self, event):
+        self.listener(event)
+
+
 def addEventListener(target, eventInterface, event, listener, *args, **kwargs):
     """
     Adds an event listener to `target`.
@@ -89,6 +165,7 @@ def addEventListener(target, eventInterface, event, listener, *args, **kwargs):
     wrapper = _createListenerWrapper(eventInterface, event, listener, args,
                                      kwargs, removeMethod)
     addMethod(wrapper)
+    _record(wrapper, target, eventInterface)
     return wrapper
 
 
@@ -114,9 +191,504 @@ def addPropertyListener(target, property, listener, *args, **kwargs):
     add_args = (wrapper,) if property is None else (property, wrapper)
     wrapper.removeMethodArgs = add_args
     target.addPropertyChangeListener(*add_args)
+    _record(wrapper, target, PropertyChangeListener)
     return wrapper
 
 
+class _PropertyMultiplexer(object):
+    """
+    Owns the single property change listener added to a target for a given
+    property, and dispatches its events to any number of Python callbacks.
+
+    The target is only referenced weakly, and the multiplexer registry only
+    references multiplexers weakly, so that neither keeps the target (or
+    anything the callbacks refer to) alive.
+
+    """
+    def __init__(self, key, target, property):
+        from java.beans import PropertyChangeListener
+        self.key = key
+        self.property = property
+        self.handles = []
+        self.targetRef = weakref.ref(target, self._targetCollected)
+        self.wrapper = _createListenerWrapper(
+            PropertyChangeListener, 'propertyChange', self.dispatch, (), {},
+            None)
+        if property is None:
+            target.addPropertyChangeListener(self.wrapper)
+        else:
+            target.addPropertyChangeListener(property, self.wrapper)
+
+    def dispatch(self, event):
+        profiling = _profile.enabled
+        for handle in tuple(self.handles):
+            if handle.multiplexer is not self:
+                continue
+            elif profiling:
+                start = System.nanoTime()
+                try:
+                    handle.listener(event, *handle.args, **handle.kwargs)
+                finally:
+                    _profile.record(handle.listener,
+                                    self.wrapper._interfaceName,
+                                    System.nanoTime() - start)
+            elif handle.args or handle.kwargs:
+                handle.listener(event, *handle.args, **handle.kwargs)
+            else:
+                handle.listener(event)
+
+    def release(self):
+        target = self.targetRef()
+        if target is not None:
+            if self.property is None:
+                target.removePropertyChangeListener(self.wrapper)
+            else:
+                target.removePropertyChangeListener(self.property,
+                                                    self.wrapper)
+
+    def _targetCollected(self, ref):
+        with _multiplexersLock:
+            if _multiplexers.get(self.key) is self:
+                del _multiplexers[self.key]
+
+
+class SharedListener(object):
+    """
+    Handle for a callback added with :func:`~addSharedPropertyListener`.
+
+    """
+    __slots__ = ('multiplexer', 'listener', 'args', 'kwargs', '__weakref__')
+
+    def __init__(self, multiplexer, listener, args, kwargs):
+        self.multiplexer = multiplexer
+        self.listener = listener
+        self.args = args
+        self.kwargs = kwargs
+
+    def unlisten(self):
+        multiplexer = self.multiplexer
+        if multiplexer is None:
+            return
+
+        self.multiplexer = None
+        with _multiplexersLock:
+            multiplexer.handles.remove(self)
+            if multiplexer.handles:
+                return
+            if _multiplexers.get(multiplexer.key) is multiplexer:
+                del _multiplexers[multiplexer.key]
+
+        multiplexer.release()
+
+
+def addSharedPropertyListener(target, property, listener, *args, **kwargs):
+    """
+    Works like :func:`~addPropertyListener`, except that only a single
+    property change listener is added to the target for each property, no
+    matter how many callbacks are added through this function. Events are
+    then dispatched to the callbacks on the Python side. The shared listener
+    is removed from the target when the last callback is removed.
+
+    :return: a :class:`~SharedListener` that you can use to stop listening
+             to these events (with :meth:`~SharedListener.unlisten`)
+
+    """
+    key = (id(target), property)
+    with _multiplexersLock:
+        multiplexer = _multiplexers.get(key)
+        if multiplexer is None or multiplexer.targetRef() is not target:
+            multiplexer = _PropertyMultiplexer(key, target, property)
+            _multiplexers[key] = multiplexer
+
+        handle = SharedListener(multiplexer, listener, args, kwargs)
+        multiplexer.handles.append(handle)
+
+    from java.beans import PropertyChangeListener
+    _record(handle, target, PropertyChangeListener)
+    return handle
+
+
+class ListenerGroup(object):
+    """
+    Keeps track of a number of event listeners so they can all be removed at
+    once. Listeners can be added to the group explicitly with :meth:`add`,
+    and while the group is used as a context manager, every listener added
+    with the functions in this module (in the same thread) is added to it
+    automatically::
+
+        with ListenerGroup() as listeners:
+            addActionListener(button, handleEvent)
+            addPropertyListener(model, 'value', handleChange)
+
+        ...
+        listeners.unlistenAll()
+
+    :ivar listeners: a list of ``(listener, target, event interface)`` tuples
+
+    """
+    def __init__(self):
+        self.listeners = []
+
+    def __enter__(self):
+        stack = getattr(_groupState, 'stack', None)
+        if stack is None:
+            stack = _groupState.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _groupState.stack.remove(self)
+
+    def __len__(self):
+        return len(self.listeners)
+
+    def add(self, listener, target=None, eventInterface=None):
+        """
+        Adds a listener to this group.
+
+        :param listener: an object with an ``unlisten()`` method, like the
+            return value of :func:`~addEventListener`
+        :param target: the object being listened to (used in
+            :meth:`getCounts`)
+        :param eventInterface: the interface of the listener (used in
+            :meth:`getCounts`)
+        :return: the listener
+
+        """
+        self.listeners.append((listener, target, eventInterface))
+        return listener
+
+    def unlistenAll(self):
+        """
+        Removes every listener in this group from its target and empties the
+        group.
+
+        :return: the number of listeners removed
+
+        """
+        listeners = self.listeners
+        self.listeners = []
+        for listener, _, _ in listeners:
+            listener.unlisten()
+        return len(listeners)
+
+    def getCounts(self):
+        """
+        Counts the listeners in this group per target object and event
+        interface, most listeners first.
+
+        :return: a list of ``(target, event interface, count)`` tuples
+
+        """
+        counts = OrderedDict()
+        for _, target, eventInterface in self.listeners:
+            key = id(target), eventInterface
+            entry = counts.get(key)
+            counts[key] = (target, eventInterface,
+                           entry[2] + 1 if entry else 1)
+        return sorted(counts.values(), key=lambda entry: entry[2],
+                      reverse=True)
+
+    def disposeWith(self, window):
+        """
+        Removes all listeners in this group once the given window has been
+        closed (disposed).
+
+        """
+        from java.awt.event import WindowListener
+        wrapper = _createListenerWrapper(
+            WindowListener, 'windowClosed', self._windowClosed, (), {},
+            window.removeWindowListener)
+        window.addWindowListener(wrapper)
+        self.add(wrapper, window, WindowListener)
+
+    def _windowClosed(self, event):
+        self.unlistenAll()
+
+
+#
+# Dispatch profiling
+#
+
+def _describeCallable(func):
+    owner = getattr(func, '__self__', None)
+    name = getattr(func, '__name__', None)
+    if name is None:
+        owner = func
+        name = '__call__'
+    if owner is not None:
+        cls = owner.__class__
+        return '%s.%s.%s' % (cls.__module__, cls.__name__, name)
+    return '%s.%s' % (getattr(func, '__module__', None), name)
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    index = min(int(len(samples) * fraction), len(samples) - 1)
+    return samples[index]
+
+
+class _DispatchStats(object):
+    __slots__ = ('count', 'totalTime', 'maxTime', 'slow', 'samples')
+
+    def __init__(self, maxSamples):
+        self.count = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+        self.slow = 0
+        self.samples = deque(maxlen=maxSamples)
+
+    def snapshot(self, name):
+        samples = sorted(self.samples)
+        return dict(name=name, count=self.count, totalTime=self.totalTime,
+                    maxTime=self.maxTime, slow=self.slow,
+                    p50=_percentile(samples, 0.5),
+                    p99=_percentile(samples, 0.99))
+
+
+class _DispatchProfile(object):
+    enabled = False
+    threshold = None
+    logger = None
+    maxSamples = 1000
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.listeners = {}
+            self.interfaces = {}
+
+    def record(self, listener, interfaceName, elapsed):
+        elapsed /= 1000000000.0
+        name = _describeCallable(listener)
+        slow = self.threshold is not None and elapsed >= self.threshold
+        with self.lock:
+            for table, key in ((self.listeners, name),
+                               (self.interfaces, interfaceName)):
+                stats = table.get(key)
+                if stats is None:
+                    stats = table[key] = _DispatchStats(self.maxSamples)
+                stats.count += 1
+                stats.totalTime += elapsed
+                stats.maxTime = max(stats.maxTime, elapsed)
+                stats.slow += slow
+                stats.samples.append(elapsed)
+
+        if slow:
+            self.logger.warning(
+                'Slow event dispatch (%.1f ms) to %s (%s) from:\n%s',
+                elapsed * 1000, name, interfaceName,
+                ''.join(traceback.format_stack()[:-2]))
+
+_profile = _DispatchProfile()
+
+
+def _profiledHandleEvent(self, event):
+    # Callbacks of shared property listeners are timed by the multiplexer
+    if isinstance(getattr(self.listener, '__self__', None),
+                  _PropertyMultiplexer):
+        self.handleEvent(event)
+        return
+
+    start = System.nanoTime()
+    try:
+        self.handleEvent(event)
+    finally:
+        _profile.record(self.listener, self._interfaceName,
+                        System.nanoTime() - start)
+
+
+def _setProfiled(profiled):
+    for wrapperClass in list(_wrapperClassMap.values()):
+        handleEvent = (_profiledHandleEvent if profiled else
+                       wrapperClass.__mro__[1].__dict__['handleEvent'])
+        for eventName in wrapperClass._eventNames:
+            setattr(wrapperClass, eventName, handleEvent)
+
+
+def enableProfiling(threshold=None, logger=None, maxSamples=1000):
+    """
+    Starts timing the calls to every listener added through this module
+    (see :func:`~getProfileSnapshot`). Listeners that were added before
+    profiling was enabled are timed too.
+
+    :param threshold: time in seconds; any single call to a listener that
+        takes longer is logged, along with the Python stack it was
+        dispatched from
+    :param logger: the :class:`logging.Logger` for slow calls (default: the
+        logger of this module)
+    :param maxSamples: the number of most recent call times kept per
+        listener and interface for calculating the percentiles
+
+    """
+    _profile.threshold = threshold
+    _profile.logger = logger or logging.getLogger(__name__)
+    _profile.maxSamples = maxSamples
+    _profile.enabled = True
+    _setProfiled(True)
+
+
+def disableProfiling():
+    """
+    Stops timing listener calls. The statistics collected so far remain
+    available until :func:`~resetProfile` is called.
+
+    """
+    _profile.enabled = False
+    _setProfiled(False)
+
+
+def resetProfile():
+    """Discards all the statistics collected so far."""
+
+    _profile.reset()
+
+
+def getProfileSnapshot():
+    """
+    Returns the listener call statistics collected while profiling was
+    enabled, as a dictionary with the keys ``listeners`` (statistics per
+    listener callable) and ``interfaces`` (statistics per event interface).
+    Both are lists of dictionaries with the following keys, sorted by total
+    time (highest first):
+
+    * ``name``: the name of the listener or the event interface
+    * ``count``: the number of calls
+    * ``totalTime``: the total time spent in the calls (in seconds)
+    * ``maxTime``: the duration of the longest call
+    * ``p50``, ``p99``: the median and the 99th percentile of the call
+      durations (of the most recent calls)
+    * ``slow``: the number of calls that took longer than the threshold
+
+    """
+    with _profile.lock:
+        snapshot = {}
+        for key, table in (('listeners', _profile.listeners),
+                           ('interfaces', _profile.interfaces)):
+            entries = [stats.snapshot(name) for name, stats in table.items()]
+            entries.sort(key=lambda entry: entry['totalTime'], reverse=True)
+            snapshot[key] = entries
+
+    return snapshot
+
+
+class CoalescingListener(object):
+    """
+    A callable that collects the events it is called with and passes them on
+    to the wrapped listener later, in the event dispatch thread (see
+    :func:`~coalesce`).
+
+    """
+    __slots__ = ('listener', 'mode', 'delay', 'batch', '_events', '_args',
+                 '_kwargs', '_timer', '_scheduled', '__weakref__')
+
+    def __init__(self, listener, mode, delay, batch):
+        if mode not in (DEBOUNCE, THROTTLE, NEXT_CYCLE):
+            raise ValueError('Unknown coalescing mode: %s' % mode)
+
+        self.listener = listener
+        self.mode = mode
+        self.delay = delay
+        self.batch = batch
+        self._events = []
+        self._args = ()
+        self._kwargs = {}
+        self._timer = None
+        self._scheduled = False
+
+    def __call__(self, event, *args, **kwargs):
+        if self.batch:
+            self._events.append(event)
+        else:
+            self._events = [event]
+        self._args = args
+        self._kwargs = kwargs
+
+        if self.mode == DEBOUNCE:
+            self._getTimer().restart()
+        elif self.mode == THROTTLE:
+            timer = self._getTimer()
+            if not timer.isRunning():
+                # Deliver the first event of a window right away, but still
+                # in the event dispatch thread
+                runSwing(self.flush)
+                timer.restart()
+        elif not self._scheduled:
+            self._scheduled = True
+            runSwingLater(self._cycleEnded)
+
+    @property
+    def pending(self):
+        """``True`` if there are events waiting to be delivered."""
+
+        return bool(self._events)
+
+    def flush(self):
+        """Delivers any pending events to the listener right away."""
+
+        events = self._events
+        if events:
+            self._events = []
+            event = events if self.batch else events[0]
+            self.listener(event, *self._args, **self._kwargs)
+
+    def cancel(self):
+        """Discards any pending events."""
+
+        self._events = []
+        if self._timer:
+            self._timer.stop()
+
+    def _getTimer(self):
+        if self._timer is None:
+            from javax.swing import Timer
+            self._timer = Timer(self.delay, None)
+            self._timer.repeats = False
+            addActionListener(self._timer, self._timerFired)
+        return self._timer
+
+    def _timerFired(self, event):
+        if self._events:
+            self.flush()
+            if self.mode == THROTTLE:
+                # Start a new window, since events were just delivered
+                self._timer.restart()
+
+    def _cycleEnded(self):
+        self._scheduled = False
+        self.flush()
+
+
+def coalesce(listener, mode=DEBOUNCE, delay=200, batch=False):
+    """
+    Wraps a listener so that bursts of events result in fewer calls to it.
+    The returned object can be used as the listener with any of the functions
+    in this module, and it passes on the extra arguments given to them.
+
+    The available modes are:
+
+    * ``DEBOUNCE``: the listener is called once no more events have arrived
+      for `delay` milliseconds
+    * ``THROTTLE``: the listener is called right away, and then at most once
+      per `delay` milliseconds for as long as events keep arriving
+    * ``NEXT_CYCLE``: the listener is called once, in the next event dispatch
+      cycle, for all the events fired in the current one (`delay` is not
+      used)
+
+    :param mode: one of the modes above
+    :param delay: the delay in milliseconds
+    :param batch: ``True`` to call the listener with a list of all the events
+        that arrived in the meantime, ``False`` to only pass the last one
+    :rtype: :class:`~CoalescingListener`
+
+    """
+    return CoalescingListener(listener, mode, delay, batch)
+
+
 #
 # Shortcuts for java.awt.event
 #
@@ -154,6 +726,17 @@ def addFocusLostListener(target, listener, *args, **kwargs):
                             *args, **kwargs)
 
 
+def addHierarchyListener(target, listener, *args, **kwargs):
+    """
+    Shortcut for addEventListener(target, HierarchyListener,
+    'hierarchyChanged', listener).
+
+    """
+    from java.awt.event import HierarchyListener
+    return addEventListener(target, HierarchyListener, 'hierarchyChanged',
+                            listener, *args, **kwargs)
+
+
 def addMouseClickListener(target, listener, *args, **kwargs):
     """
     Shortcut for addEventListener(target, MouseListener, 'mouseClicked',
@@ -1,17 +1,29 @@
 from array import array
+import gc
 import logging
+import time
+import weakref
 
-from java.lang import String, Integer
+from java.lang import String, Integer, System
 from javax.swing import JTextField, JFormattedTextField, JList, JComboBox, \
     SpinnerNumberModel, JSpinner, JSlider, JProgressBar, JTable, \
-    DefaultListSelectionModel, JCheckBox
+    DefaultListSelectionModel, JCheckBox, JPanel
 from javax.swing.table import DefaultTableColumnModel, TableColumn
 
-from swingutils.binding import BindingGroup, BindingExpression, TWOWAY, MANUAL
+from swingutils.binding import BindingGroup, BindingExpression, \
+    CallableExpression, TWOWAY, MANUAL, countLiveBindings, getLiveGroups
+from swingutils.binding.adapters import AdapterRegistry
+from swingutils.binding.adapters.swing import JavaBeansPropertyAdapter, \
+    JTextComponentAdapter
+from swingutils.binding.export import exportGroups, exportDOT
+from swingutils.binding.parser import ExpressionCache, VariableNode
 from swingutils.beans import AutoChangeNotifier, JavaBeanSupport
+from swingutils.events import addPropertyListener
 from swingutils.models.list import DelegateListModel
 from swingutils.models.combobox import DelegateComboBoxModel
 from swingutils.models.table import ObjectTableModel
+from swingutils.threads.swing import callSwing
+from swingutils.threads.threadpool import TaskExecutor
 
 
 class Person(JavaBeanSupport, AutoChangeNotifier):
@@ -47,6 +59,85 @@ class TestExpressions(object):
         expr.setValue(1980)
         assert self.person.birthYear == 1980
 
+    def testReadWritePath(self):
+        self.person.children.append(Person(u'Mike', u'Average', 1995))
+        expr = BindingExpression(self.person, u'children[-1].firstName')
+        assert expr.compiled.accessor is not None
+        assert expr.getValue() == u'Mike'
+
+        expr.setValue(u'Michael')
+        assert self.person.children[0].firstName == u'Michael'
+
+    def testPathVariable(self):
+        other = Person(u'Mary', u'Mediocre', 1975)
+        expr = BindingExpression(self.person, u'other.lastName',
+                                 vars={'other': other})
+        assert expr.getValue() == u'Mediocre'
+
+    def testPathMissingName(self):
+        expr = BindingExpression(self.person, u'spouse.firstName')
+        try:
+            expr.getValue()
+        except NameError:
+            pass
+        else:
+            raise AssertionError('NameError not raised')
+
+    def testCompiledExpressionShared(self):
+        other = Person(u'Mary', u'Mediocre', 1975)
+        expr1 = BindingExpression(self.person, u'lastName')
+        expr2 = BindingExpression(other, u'lastName')
+        assert expr1.compiled is expr2.compiled
+        assert expr1.getValue() == u'Average'
+        assert expr2.getValue() == u'Mediocre'
+
+    def testChainTemplatesShared(self):
+        other = Person(u'Mary', u'Mediocre', 1975)
+        expr1 = BindingExpression(self.person, u'children[0].lastName',
+                                  ignoreErrors=True)
+        expr2 = BindingExpression(other, u'children[0].lastName',
+                                  ignoreErrors=True)
+        expr1.bind(lambda: None)
+        expr2.bind(lambda: None)
+        try:
+            assert expr1.chains[0] is not expr2.chains[0]
+            assert expr1.chains[0].children[0].template is \
+                expr2.chains[0].children[0].template
+        finally:
+            expr1.unbind()
+            expr2.unbind()
+
+    def testChainPrefixShared(self):
+        self.person.spouse = Person(u'Mary', u'Average', 1972)
+        expr = BindingExpression(self.person,
+                                 u'spouse.firstName + " " + spouse.lastName')
+        events = []
+        expr.bind(lambda: events.append(None))
+        try:
+            assert len(expr.chains) == 1
+            assert expr.countListeners() == 3
+            assert len(list(expr.iterPaths())) == 2
+
+            self.person.spouse = Person(u'Jane', u'Doe', 1974)
+            assert len(events) == 1
+            assert expr.getValue() == u'Jane Doe'
+            assert expr.countListeners() == 3
+        finally:
+            expr.unbind()
+
+
+class TestExpressionCache(object):
+    def testEviction(self):
+        cache = ExpressionCache(2)
+        first = cache.get(u'a')
+        cache.get(u'b')
+        assert cache.get(u'a') is first
+        cache.get(u'c')
+        assert len(cache) == 2
+        assert cache.get(u'a') is first
+        assert cache.misses == 3
+        assert cache.hits == 2
+
 
 class TestBinding(object):
     def setup(self):
@@ -93,6 +184,371 @@ class TestBinding(object):
         assert self.person.birthYear == 1978
         assert self.dummy.value == 1978
 
+    def testCoalesce(self):
+        events = []
+        self.group.bind(self.person, u'"%s %s" % (firstName, lastName)',
+                        self.dummy, u'value', coalesce=True)
+        assert self.dummy.value == u'Joe Average'
+        addPropertyListener(self.dummy, 'value', events.append)
+
+        self.person.firstName = u'Mary'
+        self.person.lastName = u'Mediocre'
+        assert self.dummy.value == u'Joe Average'
+
+        callSwing(lambda: None)
+        assert self.dummy.value == u'Mary Mediocre'
+        assert len(events) == 1
+
+    def testSkipUnchanged(self):
+        events = []
+        addPropertyListener(self.dummy, 'value', events.append)
+        binding = self.group.bind(self.person, u'lastName.upper()',
+                                  self.dummy, u'value', skipUnchanged=True)
+        assert self.dummy.value == u'AVERAGE'
+        assert len(events) == 1
+
+        self.person.lastName = u'average'
+        assert binding.skippedWrites == 1
+        assert len(events) == 1
+
+        self.person.lastName = u'Mediocre'
+        assert self.dummy.value == u'MEDIOCRE'
+        assert len(events) == 2
+        assert self.group.skippedWrites == 1
+
+    def testInstrumentation(self):
+        self.group.bind(self.person, u'firstName', self.dummy, u'value')
+        self.group.bind(self.person, u'lastName', self.dummy, u'value',
+                        instrument=True)
+        self.person.lastName = u'Mediocre'
+
+        report = self.group.report()
+        assert len(report) == 1
+        entry = report[0]
+        assert entry['source'] == u'lastName'
+        assert entry['syncs'] == 2
+        assert entry['reverseSyncs'] == 0
+        assert entry['errors'] == 0
+        assert entry['events'] == 1
+        assert entry['listeners'] == 1
+        assert entry['syncTime'] >= entry['evaluationTime']
+
+    def testExecutor(self):
+        executor = TaskExecutor()
+        try:
+            binding = self.group.bind(self.person, u'lastName.upper()',
+                                      self.dummy, u'value', executor=executor)
+            for _ in range(100):
+                if callSwing(lambda: self.dummy.value) == u'AVERAGE':
+                    break
+                time.sleep(0.05)
+            assert self.dummy.value == u'AVERAGE'
+            assert binding._future is None
+        finally:
+            executor.shutdown()
+
+    def testRebindSameValue(self):
+        spouse = Person(u'Mary', u'Average', 1972)
+        self.person.spouse = spouse
+        binding = self.group.bind(self.person, u'spouse.firstName',
+                                  self.dummy, u'value', instrument=True)
+        stats = binding.sourceExpression.stats
+        leaf = binding.sourceExpression.chains[0].children[0]
+        adapter = leaf.adapter
+
+        self.person.firePropertyChange('spouse', None, spouse)
+        assert stats.events == 1
+        assert stats.rebinds == 0
+        assert leaf.adapter is adapter
+
+        self.person.spouse = Person(u'Jane', u'Doe', 1974)
+        assert stats.rebinds == 1
+        assert leaf.adapter is not adapter
+        assert self.dummy.value == u'Jane'
+
+    def testOrderedPropagation(self):
+        values = []
+        binding = self.group.bind(self.person, u'age * 100 + birthYear',
+                                  self.dummy, u'value', instrument=True)
+        self.group.bind(self.person, u'2014 - birthYear', self.person,
+                        u'age')
+        addPropertyListener(self.dummy, 'value', values.append)
+        evaluations = binding.sourceExpression.stats.evaluations
+
+        self.person.birthYear = 1975
+        assert self.dummy.value == 5875
+        assert len(values) == 1
+        assert binding.sourceExpression.stats.evaluations == evaluations + 1
+
+    def testOrderedPropagationUnshared(self):
+        values = []
+        self.group.bind(self.person, u'age * 100 + birthYear', self.dummy,
+                        u'value', shareListeners=False)
+        self.group.bind(self.person, u'2014 - birthYear', self.person,
+                        u'age', shareListeners=False)
+        addPropertyListener(self.dummy, 'value', values.append)
+
+        self.person.birthYear = 1975
+        assert self.dummy.value == 5875
+        assert len(values) == 1
+
+    def testFindCycles(self):
+        binding1 = self.group.bind(self.person, u'birthYear', self.dummy,
+                                   u'value')
+        assert self.group.findCycles() == []
+
+        binding2 = self.group.bind(self.dummy, u'value', self.person,
+                                   u'birthYear')
+        cycles = self.group.findCycles()
+        assert len(cycles) == 1
+        assert set(cycles[0]) == set([binding1, binding2])
+
+    def testCyclePropagation(self):
+        messages = []
+        handler = logging.Handler()
+        handler.emit = lambda record: messages.append(record.getMessage())
+        logger = logging.getLogger(__name__ + '.cycles')
+        logger.addHandler(handler)
+        try:
+            binding1 = self.group.bind(self.person, u'birthYear + 1',
+                                       self.dummy, u'value', instrument=True,
+                                       logger=logger)
+            binding2 = self.group.bind(self.dummy, u'value', self.person,
+                                       u'birthYear', instrument=True,
+                                       logger=logger)
+            syncs1 = binding1.stats.syncs
+            syncs2 = binding2.stats.syncs
+
+            self.person.birthYear = 1980
+        finally:
+            logger.removeHandler(handler)
+
+        assert binding1.stats.syncs == syncs1 + 1
+        assert binding2.stats.syncs == syncs2 + 1
+        assert self.dummy.value == 1981
+        assert self.person.birthYear == 1981
+        assert messages == ['Binding cycle detected: '
+                            'birthYear + 1 -> value, value -> birthYear']
+
+    def testBindAll(self):
+        other = Person()
+        bindings = self.group.bindAll(
+            self.person, other,
+            [(u'firstName', u'firstName'), (u'lastName', u'lastName')],
+            mode=TWOWAY)
+        assert len(bindings) == 2
+        assert other.firstName == u'Joe'
+        assert other.lastName == u'Average'
+
+        other.lastName = u'Mediocre'
+        assert self.person.lastName == u'Mediocre'
+
+    def testBindAllDependencyOrder(self):
+        self.person.age = None
+        bindings = self.group.bindAll(self.person, self.person,
+                                      [(u'age * 100', u'score'),
+                                       (u'2014 - birthYear', u'age')],
+                                      ignoreErrors=True, instrument=True)
+        assert self.person.age == 44
+        assert self.person.score == 4400
+        assert bindings[0].stats.syncs == 1
+        assert bindings[0].stats.errors == 0
+
+    def testRebase(self):
+        other = Person(u'Mary', u'Mediocre', 1975)
+        binding = self.group.bind(self.person, u'lastName', self.dummy,
+                                  u'value')
+        chain = binding.sourceExpression.chains[0]
+
+        self.group.rebase(other)
+        assert self.dummy.value == u'Mediocre'
+        assert binding.sourceExpression.chains[0] is chain
+
+        self.person.lastName = u'Doe'
+        assert self.dummy.value == u'Mediocre'
+
+        other.lastName = u'Smith'
+        assert self.dummy.value == u'Smith'
+
+    def testRebaseKeepsListeners(self):
+        spouse = Person(u'Mary', u'Average', 1972)
+        friend = Person(u'Jane', u'Doe', 1974)
+        other = Person(u'Mike', u'Average', 1971)
+        self.person.spouse = other.spouse = spouse
+        binding = self.group.bind(
+            self.person, u'spouse.firstName + " " + friend.lastName',
+            self.dummy, u'value', vars={'friend': friend})
+        spouseChain, friendChain = sorted(
+            binding.sourceExpression.chains,
+            key=lambda chain: isinstance(chain, VariableNode))
+        spouseAdapter = spouseChain.children[0].adapter
+        friendAdapter = friendChain.children[0].adapter
+
+        self.group.rebase(other)
+        assert spouseChain.lastParentRef() is other
+        assert spouseChain.children[0].adapter is spouseAdapter
+        assert friendChain.children[0].adapter is friendAdapter
+
+        spouse.firstName = u'Sue'
+        assert self.dummy.value == u'Sue Doe'
+
+    def testRebaseSharedRoot(self):
+        other = Person(u'Mary', u'Mediocre', 1975)
+        self.group.bind(self.person, u'2014 - birthYear', self.person,
+                        u'age')
+        assert self.person.age == 44
+
+        self.group.rebase(other)
+        assert other.age == 39
+        assert self.person.age == 44
+
+        other.birthYear = 1980
+        assert other.age == 34
+        assert self.person.age == 44
+
+    def testCallableSource(self):
+        self.group.bind(self.person, lambda p: p.lastName.upper(),
+                        self.dummy, u'value', dependencies=[u'lastName'])
+        assert self.dummy.value == u'AVERAGE'
+
+        self.person.lastName = u'Mediocre'
+        assert self.dummy.value == u'MEDIOCRE'
+
+    def testCallableSingleDependency(self):
+        binding = self.group.bind(self.person, lambda p: p.lastName.upper(),
+                                  self.dummy, u'value',
+                                  dependencies=u'lastName')
+        assert binding.sourceExpression.compiled.sources == (u'lastName',)
+
+        self.person.lastName = u'Mediocre'
+        assert self.dummy.value == u'MEDIOCRE'
+
+    def testCallableExpressionTwoWay(self):
+        def setAge(person, age):
+            person.birthYear = 2014 - age
+
+        age = CallableExpression(self.person, lambda p: 2014 - p.birthYear,
+                                 setAge, dependencies=[u'birthYear'])
+        self.group.bind(self.person, age, self.dummy, u'value', mode=TWOWAY)
+        assert self.dummy.value == 44
+
+        self.dummy.value = 30
+        assert self.person.birthYear == 1984
+
+        self.person.birthYear = 2000
+        assert self.dummy.value == 14
+
+    def testExport(self):
+        self.person.spouse = Person(u'Mary', u'Average', 1972)
+        self.group.bind(self.person, u'spouse.lastName', self.dummy,
+                        u'value', instrument=True)
+        self.group.bind(self.person, u'spouse.lastName.upper()', DummyObject(),
+                        u'value')
+        assert self.group in getLiveGroups()
+
+        data = exportGroups([self.group])
+        bindings = data['groups'][0]['bindings']
+        assert len(bindings) == 2
+        assert bindings[0]['stats']['syncs'] == 1
+        chain = bindings[0]['source']['chains'][0]
+        assert chain['label'] == u'Attribute(spouse)'
+        assert chain['children'][0]['listeners'] == [u'property']
+
+        top = data['listenerCounts'][0]
+        assert top['nodes'] == 2
+        assert top['property'] in (u'spouse', u'lastName')
+        assert exportDOT([self.group]).startswith(u'digraph')
+
+    def testSuspend(self):
+        self.group.bind(self.person, u'lastName', self.dummy, u'value')
+        self.group.suspend()
+        self.person.lastName = u'Mediocre'
+        self.person.lastName = u'Doe'
+        assert self.dummy.value == u'Average'
+
+        self.group.resume()
+        assert self.dummy.value == u'Doe'
+
+        self.group.suspend(unbind=True)
+        self.person.lastName = u'Smith'
+        assert self.dummy.value == u'Doe'
+
+        self.group.resume()
+        assert self.dummy.value == u'Smith'
+
+        self.person.lastName = u'Jones'
+        assert self.dummy.value == u'Jones'
+
+    def testUnbindWhileHidden(self):
+        events = []
+        addPropertyListener(self.dummy, 'value', events.append)
+        for unbind in (False, True):
+            self.group.bind(self.person, u'lastName', self.dummy, u'value')
+            del events[:]
+            self.group.attachToComponent(JPanel(), unbind)
+            assert self.group.suspended
+
+            self.person.lastName = u'Mediocre' if unbind else u'Doe'
+            self.group.unbind()
+            assert events == []
+            assert not self.group.suspended
+
+    def testWeak(self):
+        binding = self.group.bind(self.person, u'lastName', self.dummy,
+                                  u'value', weak=True)
+        assert self.dummy.value == u'Average'
+        assert binding.sourceExpression.root is self.person
+        assert countLiveBindings() == 1
+
+        self.group.unbind()
+        assert countLiveBindings() == 0
+
+    def testWeakReaped(self):
+        target = DummyObject()
+        self.group.bind(self.person, u'lastName', target, u'value',
+                        weak=True)
+        assert target.value == u'Average'
+        assert len(self.person.getPropertyChangeListeners()) == 1
+
+        del target
+        gc.collect()
+        System.gc()
+        callSwing(lambda: None)  # run the queued unbind
+        assert countLiveBindings() == 0
+        assert len(self.person.getPropertyChangeListeners()) == 0
+
+    def testDroppedGroupCollected(self):
+        person = Person(u'Mary', u'Mediocre', 1975)
+        group = BindingGroup()
+        group.bind(person, u'lastName', self.dummy, u'value')
+        assert self.dummy.value == u'Mediocre'
+        personRef = weakref.ref(person)
+
+        del person, group
+        gc.collect()
+        System.gc()
+        gc.collect()
+        assert personRef() is None
+
+    def testRebindPlainListItem(self):
+        mike = Person(u'Mike', u'Average', 1995)
+        sally = Person(u'Sally', u'Average', 1997)
+        self.person.children = [mike]
+        self.group.bind(self.person, u'children[0].firstName', self.dummy,
+                        u'value')
+        assert self.dummy.value == u'Mike'
+
+        self.person.children.insert(0, sally)
+        self.person.firePropertyChange('children', None,
+                                       self.person.children)
+        assert self.dummy.value == u'Sally'
+
+        sally.firstName = u'Sarah'
+        assert self.dummy.value == u'Sarah'
+
+        mike.firstName = u'Michael'
+        assert self.dummy.value == u'Sarah'
+
     def testGeneratorExpr(self):
         self.group.bind(self.person, u'u" ".join(c for c in firstName)',
                         self.dummy, u'value')
@@ -132,6 +588,26 @@ class TestBinding(object):
         assert self.dummy.value == u'Mediocre'
 
 
+class TestAdapterRegistry(object):
+    def testLookupCache(self):
+        registry = AdapterRegistry()
+        registry.registerDefaultPropertyAdapter(JavaBeansPropertyAdapter)
+        person = Person(u'Joe', u'Average', 1970)
+        options = {}
+
+        adapter = registry.getPropertyAdapter(person, options, 'firstName')
+        assert isinstance(adapter, JavaBeansPropertyAdapter)
+        registry.getPropertyAdapter(person, options, 'firstName')
+        assert registry.getCacheStats() == {'hits': 1, 'misses': 1,
+                                            'size': 1}
+
+        registry.registerPropertyAdapter(JTextComponentAdapter)
+        assert registry.getCacheStats()['size'] == 0
+        field = JTextField()
+        adapter = registry.getPropertyAdapter(field, options, 'text')
+        assert isinstance(adapter, JTextComponentAdapter)
+
+
 class TestAdapters(object):
     def setup(self):
         self.person = Person(u'Joe', u'Average', 1970)
@@ -335,6 +811,28 @@ class TestAdapters(object):
         assert self.dummy.value == 2
         assert percentCompleteDummy.value == 0.2
 
+    def testListModelIndexFiltering(self):
+        mike = Person(u'Mike', u'Average', 1995)
+        sally = Person(u'Sally', u'Average', 1997)
+        listModel = DelegateListModel([mike])
+        binding = self.group.bind(listModel, 'listModel[0].firstName',
+                                  self.dummy, 'value', instrument=True,
+                                  vars={'listModel': listModel})
+        stats = binding.sourceExpression.stats
+        assert self.dummy.value == u'Mike'
+
+        listModel.append(sally)
+        listModel[1] = Person(u'Jim', u'Average', 1999)
+        assert stats.events == 0
+
+        listModel.insert(0, sally)
+        assert stats.events == 1
+        assert self.dummy.value == u'Sally'
+
+        del listModel[0]
+        assert stats.events == 2
+        assert self.dummy.value == u'Mike'
+
     def testListModel(self):
         listModel = DelegateListModel()
         self.group.bind(self.person, 'children', listModel, 'delegate')
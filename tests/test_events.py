@@ -1,7 +1,17 @@
-from javax.swing import JList, DefaultListModel
+import gc
+import time
+import weakref
+
+from java.lang import System
+from javax.swing import JList, DefaultListModel, SwingUtilities
 from javax.swing.event import ListSelectionListener
 
-from swingutils.events import addEventListener
+from swingutils.beans import JavaBeanSupport
+from swingutils.events import addEventListener, addPropertyListener, \
+    addSharedPropertyListener, coalesce, DEBOUNCE, THROTTLE, NEXT_CYCLE, \
+    ListenerGroup, enableProfiling, disableProfiling, getProfileSnapshot, \
+    resetProfile
+from swingutils.threads.swing import callSwing
 
 
 def testListSelectionEvent():
@@ -63,3 +73,171 @@ def testBuiltinListener():
     assert len(events) == 1
     assert events[0].firstIndex == 0
     assert events[0].lastIndex == 0
+
+
+def testSharedPropertyListener():
+    bean = JavaBeanSupport()
+    events1 = []
+    events2 = []
+    listener1 = addSharedPropertyListener(bean, 'value', events1.append)
+    listener2 = addSharedPropertyListener(bean, 'value', events2.append)
+    assert len(bean.getPropertyChangeListeners('value')) == 1
+
+    bean.firePropertyChange('value', 1, 2)
+    assert len(events1) == 1
+    assert len(events2) == 1
+
+    listener1.unlisten()
+    bean.firePropertyChange('value', 2, 3)
+    assert len(events1) == 1
+    assert len(events2) == 2
+
+    listener2.unlisten()
+    assert len(bean.getPropertyChangeListeners('value')) == 0
+
+
+def testSharedPropertyListenerCollected():
+    # The callback refers back to the bean, like a binding listening to it
+    bean = JavaBeanSupport()
+    events = [bean]
+    addSharedPropertyListener(bean, 'value', events.append)
+    beanRef = weakref.ref(bean)
+
+    del bean, events
+    gc.collect()
+    System.gc()
+    gc.collect()
+    assert beanRef() is None
+
+
+def testWrapperClassCached():
+    from javax.swing.event import DocumentListener
+    from javax.swing.text import PlainDocument
+
+    document = PlainDocument()
+    events = []
+    wrapper1 = addEventListener(document, DocumentListener,
+                                ('insertUpdate', 'removeUpdate'),
+                                events.append)
+    wrapper2 = addEventListener(document, DocumentListener,
+                                ['removeUpdate', 'insertUpdate'],
+                                events.append)
+    assert wrapper1.__class__ is wrapper2.__class__
+
+    document.insertString(0, u'Test', None)
+    assert len(events) == 2
+
+    wrapper1.unlisten()
+    wrapper2.unlisten()
+    document.remove(0, 1)
+    assert len(events) == 2
+
+
+def testCoalesceNextCycle():
+    bean = JavaBeanSupport()
+    batches = []
+    addPropertyListener(bean, 'value', coalesce(batches.append, NEXT_CYCLE,
+                                                batch=True))
+    for i in range(3):
+        bean.firePropertyChange('value', i, i + 1)
+    assert batches == []
+
+    callSwing(lambda: None)
+    assert len(batches) == 1
+    assert [event.newValue for event in batches[0]] == [1, 2, 3]
+
+
+def testCoalesceDebounce():
+    bean = JavaBeanSupport()
+    events = []
+    listener = coalesce(events.append, DEBOUNCE, 10000)
+    addPropertyListener(bean, 'value', listener)
+    bean.firePropertyChange('value', 1, 2)
+    bean.firePropertyChange('value', 2, 3)
+    assert events == []
+    assert listener.pending
+
+    listener.flush()
+    assert len(events) == 1
+    assert events[0].newValue == 3
+
+    bean.firePropertyChange('value', 3, 4)
+    listener.cancel()
+    assert not listener.pending
+
+
+def testCoalesceThrottle():
+    bean = JavaBeanSupport()
+    events = []
+    listener = coalesce(events.append, THROTTLE, 100)
+    addPropertyListener(bean, 'value', listener)
+
+    def fireEvents():
+        bean.firePropertyChange('value', 1, 2)
+        bean.firePropertyChange('value', 2, 3)
+        bean.firePropertyChange('value', 3, 4)
+
+    callSwing(fireEvents)
+    assert [event.newValue for event in events] == [2]
+    assert listener.pending
+
+    # Wait for the timer to deliver the last event at the end of the interval
+    for _ in range(50):
+        time.sleep(0.1)
+        if callSwing(lambda: not listener.pending):
+            break
+    assert [event.newValue for event in events] == [2, 4]
+    listener.cancel()
+
+
+def testCoalesceThrottleOutsideEDT():
+    bean = JavaBeanSupport()
+    threads = []
+    listener = coalesce(
+        lambda event: threads.append(SwingUtilities.isEventDispatchThread()),
+        THROTTLE, 10000)
+    addPropertyListener(bean, 'value', listener)
+    bean.firePropertyChange('value', 1, 2)
+
+    callSwing(lambda: None)
+    assert threads == [True]
+    listener.cancel()
+
+
+def testListenerGroup():
+    bean = JavaBeanSupport()
+    events = []
+    with ListenerGroup() as group:
+        addPropertyListener(bean, 'value', events.append)
+        addSharedPropertyListener(bean, 'value', events.append)
+    addPropertyListener(bean, 'other', events.append)
+    assert len(group) == 2
+    assert group.getCounts()[0][2] == 2
+
+    assert group.unlistenAll() == 2
+    assert len(bean.getPropertyChangeListeners('value')) == 0
+    assert len(bean.getPropertyChangeListeners('other')) == 1
+
+
+def testProfiling():
+    bean = JavaBeanSupport()
+    events = []
+    addPropertyListener(bean, 'value', events.append)
+    enableProfiling()
+    try:
+        bean.firePropertyChange('value', 1, 2)
+        bean.firePropertyChange('value', 2, 3)
+    finally:
+        disableProfiling()
+    bean.firePropertyChange('value', 3, 4)
+    assert len(events) == 3
+
+    snapshot = getProfileSnapshot()
+    resetProfile()
+    entry = snapshot['listeners'][0]
+    assert entry['name'].endswith(u'list.append')
+    assert entry['count'] == 2
+    assert entry['maxTime'] >= entry['p99'] >= entry['p50']
+    assert snapshot['interfaces'][0]['name'].endswith(
+        u'PropertyChangeListener')
+    assert getProfileSnapshot()['listeners'] == []